@@ -1,32 +1,34 @@
 from app.api.deps import get_current_user
 from app.schemas.auth import LoginRequest, RegisterRequest, UserOut
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_db
 from app.models.user import User
-from app.core.security import hash_password
+from app.core.security import hash_password_async
 
-from fastapi import APIRouter, Depends, HTTPException, Response
-from sqlalchemy.orm import Session
-from app.core.security import verify_password, create_access_token
-from app.models.restaurant import Restaurant
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from app.core.security import verify_password_async, create_access_token, decode_token
 from app.domain.roles import Role
+from app.services.restaurant_cache import restaurant_cache
+from app.core.permissions import require_role, restaurant_scope
+from app.services.token_denylist import revoke_token, revoke_user_tokens
 
 router = APIRouter(prefix="/auth")
 
 @router.post("/register", status_code=201)
-def register(payload: RegisterRequest, db: Session = Depends(get_db)):
-    if db.query(User).filter(User.email == payload.email).first():
+async def register(payload: RegisterRequest, db: AsyncSession = Depends(get_db)):
+    if await db.scalar(select(User).where(User.email == payload.email)):
         raise HTTPException(status_code=409, detail="Email already registered")
 
     user = User(
         email=payload.email,
-        hashed_password=hash_password(payload.password),
+        hashed_password=await hash_password_async(payload.password),
         role=payload.role.value,
     )
 
     db.add(user)
-    db.commit()
-    db.refresh(user) #Applies database defaults and triggers
+    await db.commit()
+    await db.refresh(user) #Applies database defaults and triggers
 
     return {
         "id": user.id,
@@ -35,21 +37,30 @@ def register(payload: RegisterRequest, db: Session = Depends(get_db)):
     }
 
 @router.post("/login")
-def login(payload: LoginRequest, db: Session = Depends(get_db), response: Response = None):
-    user = db.query(User).filter(User.email == payload.email).first()
-    if not user or not verify_password(payload.password, user.hashed_password):
+async def login(payload: LoginRequest, db: AsyncSession = Depends(get_db), response: Response = None):
+    user = await db.scalar(select(User).where(User.email == payload.email))
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    restaurant = (
-        db.query(Restaurant)
-        .filter(Restaurant.owner_id == user.id)
-        .first()
-    )
+    valid, new_hash = await verify_password_async(payload.password, user.hashed_password)
+    if not valid or not user.is_active:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    if new_hash:
+        # BCRYPT_ROUNDS changed since this hash was made
+        user.hashed_password = new_hash
+        await db.commit()
+
+    restaurant = await restaurant_cache.get_owned(db, user.id)
+    if restaurant is None and user.restaurant_id is not None:
+        # Staff accounts are attached to the restaurant they work for
+        restaurant = await restaurant_cache.get(db, user.restaurant_id)
 
     plan = restaurant.plan if restaurant else "FREE"
 
     token = create_access_token({
         "sub": str(user.id),
+        "email": user.email,
         "role": user.role,
         "plan": plan,
         "restaurant_id": restaurant.id if restaurant else None,
@@ -77,7 +88,19 @@ def login(payload: LoginRequest, db: Session = Depends(get_db), response: Respon
     }
 
 @router.post("/logout")
-def logout(response: Response):
+async def logout(request: Request, response: Response):
+    # Whichever the client authenticates with; CookieBearer accepts both
+    tokens = {request.cookies.get("access_token")}
+    scheme, _, credentials = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer":
+        tokens.add(credentials)
+
+    for token in tokens - {None, ""}:
+        try:
+            await revoke_token(decode_token(token))
+        except ValueError:
+            pass  # Already expired or invalid
+
     response.delete_cookie(
         key="access_token",
         path="/",
@@ -85,6 +108,22 @@ def logout(response: Response):
     )
     return {"message": "Logged out successfully"}
 
+@router.post("/users/{user_id}/deactivate", status_code=204)
+async def deactivate_user(
+    user_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(require_role("owner")),
+):
+    # Owners manage the staff attached to their restaurant
+    user = await db.get(User, user_id)
+    if user is None or user.id == current_user.id or user.restaurant_id != restaurant_scope(current_user):
+        raise HTTPException(status_code=404)
+
+    user.is_active = False
+    await db.commit()
+    # Stateless tokens carry no is_active; cut off the ones already issued
+    await revoke_user_tokens(user.id)
+
 @router.get("/me")
 def me(current_user: User = Depends(get_current_user)) -> UserOut:
     return {
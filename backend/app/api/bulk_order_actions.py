@@ -0,0 +1,83 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_db
+from app.domain.order_states import OrderStatus
+from app.services.order_state_machine import transition_orders
+from app.core.permissions import require_role
+from app.schemas.order import BulkTransitionRequest, BulkTransitionResponse
+
+# Same actions and roles as order_actions, applied to a list of orders
+router = APIRouter(prefix="/orders/actions/bulk", tags=["order-actions"])
+
+@router.post("/pay", response_model=BulkTransitionResponse)
+async def mark_paid_bulk(
+    payload: BulkTransitionRequest,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(require_role("owner", "manager")),
+):
+    return await transition_orders(
+        db=db,
+        order_ids=payload.order_ids,
+        new_status=OrderStatus.PAID,
+    )
+
+@router.post("/accept", response_model=BulkTransitionResponse)
+async def accept_orders_bulk(
+    payload: BulkTransitionRequest,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(require_role("kitchen", "owner")),
+):
+    return await transition_orders(
+        db=db,
+        order_ids=payload.order_ids,
+        new_status=OrderStatus.ACCEPTED,
+    )
+
+@router.post("/prepare", response_model=BulkTransitionResponse)
+async def start_preparing_bulk(
+    payload: BulkTransitionRequest,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(require_role("kitchen")),
+):
+    return await transition_orders(
+        db=db,
+        order_ids=payload.order_ids,
+        new_status=OrderStatus.PREPARING,
+    )
+
+@router.post("/ready", response_model=BulkTransitionResponse)
+async def mark_ready_bulk(
+    payload: BulkTransitionRequest,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(require_role("kitchen")),
+):
+    return await transition_orders(
+        db=db,
+        order_ids=payload.order_ids,
+        new_status=OrderStatus.READY,
+    )
+
+@router.post("/dispatch", response_model=BulkTransitionResponse)
+async def dispatch_orders_bulk(
+    payload: BulkTransitionRequest,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(require_role("rider")),
+):
+    return await transition_orders(
+        db=db,
+        order_ids=payload.order_ids,
+        new_status=OrderStatus.OUT_FOR_DELIVERY,
+    )
+
+@router.post("/complete", response_model=BulkTransitionResponse)
+async def complete_orders_bulk(
+    payload: BulkTransitionRequest,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(require_role("rider")),
+):
+    return await transition_orders(
+        db=db,
+        order_ids=payload.order_ids,
+        new_status=OrderStatus.COMPLETED,
+    )
@@ -1,10 +1,14 @@
+from dataclasses import dataclass
+from typing import Optional
 from fastapi import Request, HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from app.core.config import settings
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.replicas import get_read_db
 from app.models.user import User
+from app.services.token_denylist import is_token_revoked
 
 class CookieBearer(HTTPBearer):
     async def __call__(self, request: Request):
@@ -24,9 +28,30 @@ class CookieBearer(HTTPBearer):
 
 cookie_bearer = CookieBearer()
 
-def get_current_user(
+@dataclass
+class TokenUser:
+    """Caller built from token claims alone (AUTH_STATELESS mode)."""
+
+    id: int
+    email: Optional[str]
+    role: str
+    plan: str
+    restaurant_id: Optional[int]
+    is_active: bool = True
+
+    @classmethod
+    def from_claims(cls, payload: dict) -> "TokenUser":
+        return cls(
+            id=int(payload["sub"]),
+            email=payload.get("email"),
+            role=payload.get("role"),
+            plan=payload.get("plan"),
+            restaurant_id=payload.get("restaurant_id"),
+        )
+
+async def get_current_user(
     token: str = Depends(cookie_bearer),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     credentials_exception = HTTPException(
         status_code=401,
@@ -44,9 +69,14 @@ def get_current_user(
             raise credentials_exception
     except JWTError:
         raise credentials_exception
+
+    if settings.AUTH_STATELESS:
+        if await is_token_revoked(payload):
+            raise credentials_exception
+        return TokenUser.from_claims(payload)
     
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
+    user = await db.scalar(select(User).where(User.id == int(user_id)))
+    if user is None or not user.is_active:
         raise credentials_exception
     
     # Attach additional token claims to user object if needed
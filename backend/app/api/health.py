@@ -1,5 +1,9 @@
 from fastapi import APIRouter
 
+from app.db.pool import pool_status
+from app.db.replicas import replica_router
+from app.db.session import engine
+
 router = APIRouter()
 
 @router.get("/health")
@@ -8,3 +12,12 @@ def health_check():
         "status": "ok",
         "service": "food-ordering-backend"
     }
+
+@router.get("/health/db-pool")
+def db_pool_status():
+    # Debugging only: the numbers are for whichever worker answers. The
+    # db_pool_* series on /metrics cover every worker.
+    return {
+        "primary": pool_status(engine),
+        **{replica.name: pool_status(replica.engine) for replica in replica_router.replicas},
+    }
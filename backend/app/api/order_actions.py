@@ -1,80 +1,81 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
 from app.domain.order_states import OrderStatus
 from app.services.order_state_machine import transition_order
 from app.core.permissions import require_role
+from app.schemas.order import OrderOut
 
 router = APIRouter(prefix="/orders/actions", tags=["order-actions"])
 
-@router.post("/{order_id}/pay")
-def mark_paid(
+@router.post("/{order_id}/pay", response_model=OrderOut)
+async def mark_paid(
     order_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user=Depends(require_role("owner", "manager")),
 ):
-    return transition_order(
+    return await transition_order(
         db=db,
         order_id=order_id,
         new_status=OrderStatus.PAID,
     )
 
-@router.post("/{order_id}/accept")
-def accept_order(
+@router.post("/{order_id}/accept", response_model=OrderOut)
+async def accept_order(
     order_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user=Depends(require_role("kitchen", "owner")),
 ):
-    return transition_order(
+    return await transition_order(
         db=db,
         order_id=order_id,
         new_status=OrderStatus.ACCEPTED,
     )
 
-@router.post("/{order_id}/prepare")
-def start_preparing(
+@router.post("/{order_id}/prepare", response_model=OrderOut)
+async def start_preparing(
     order_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user=Depends(require_role("kitchen")),
 ):
-    return transition_order(
+    return await transition_order(
         db=db,
         order_id=order_id,
         new_status=OrderStatus.PREPARING,
     )
 
-@router.post("/{order_id}/ready")
-def mark_ready(
+@router.post("/{order_id}/ready", response_model=OrderOut)
+async def mark_ready(
     order_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user=Depends(require_role("kitchen")),
 ):
-    return transition_order(
+    return await transition_order(
         db=db,
         order_id=order_id,
         new_status=OrderStatus.READY,
     )
 
-@router.post("/{order_id}/dispatch")
-def dispatch_order(
+@router.post("/{order_id}/dispatch", response_model=OrderOut)
+async def dispatch_order(
     order_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user=Depends(require_role("rider")),
 ):
-    return transition_order(
+    return await transition_order(
         db=db,
         order_id=order_id,
         new_status=OrderStatus.OUT_FOR_DELIVERY,
     )
 
-@router.post("/{order_id}/complete")
-def complete_order(
+@router.post("/{order_id}/complete", response_model=OrderOut)
+async def complete_order(
     order_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user=Depends(require_role("rider")),
 ):
-    return transition_order(
+    return await transition_order(
         db=db,
         order_id=order_id,
         new_status=OrderStatus.COMPLETED,
@@ -1,57 +1,141 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Any
+from fastapi import APIRouter, Body, Depends, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.db.replicas import get_read_db
 from app.db.session import get_db
 from app.models.order import Order
 from app.models.order_item import OrderItem
-from app.core.permissions import require_role
-from app.infrastructure.event_bus import publish_order_event
+from app.core.permissions import require_role, restaurant_scope
+from app.domain.order_states import OrderStatus
+from app.domain.payment_states import PaymentStatus
+from app.infrastructure.outbox import add_order_event
+from app.schemas.order import BulkOrderResponse, OrderBoardOut, OrderPage, OrderWithItemsOut
+from app.services.active_orders import release_active_orders
+from app.services.idempotency import idempotent
+from app.services.order_board import get_order_board
+from app.services.order_ingestion import MAX_BULK_ORDERS, ingest_orders
+from app.services.resource_versions import bump_orders_version, not_modified, orders_version_key
 from app.services.subscription_guard import enforce_order_limit
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
-@router.post("/")
-def create_order(
+MAX_PAGE_SIZE = 200
+
+@router.post("/", response_model=OrderWithItemsOut)
+@idempotent
+async def create_order(
     restaurant_id: int,
     user_id: int,
     items: list[dict],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user=Depends(require_role("owner", "manager")),
 ):
-    enforce_order_limit(db, restaurant_id)
-    
-    order = Order(
-        restaurant_id=restaurant_id,
-        user_id=user_id,
-    )
+    await enforce_order_limit(db, restaurant_id)
 
-    total = 0
-    for item in items:
-        order_item = OrderItem(
-            product_name=item["product_name"],
-            quantity=item["quantity"],
-            unit_price=item["unit_price"],
+    try:
+        order = Order(
+            restaurant_id=restaurant_id,
+            user_id=user_id,
         )
-        total += item["quantity"] * item["unit_price"]
-        order.items.append(order_item)
-
-    order.total_amount = total
-    db.add(order)
-    db.commit()
-    db.refresh(order)
-
-    publish_order_event({
-        "type": "ORDER_CREATED",
-        "order_id": order.id,
-        "restaurant_id": order.restaurant_id,
-        "status": order.status,
-        "total": float(order.total_amount),
-    })
 
+        total = 0
+        for item in items:
+            order_item = OrderItem(
+                product_name=item["product_name"],
+                quantity=item["quantity"],
+                unit_price=item["unit_price"],
+            )
+            total += item["quantity"] * item["unit_price"]
+            order.items.append(order_item)
+
+        order.total_amount = total
+        db.add(order)
+        await db.flush()
+
+        add_order_event(db, {
+            "type": "ORDER_CREATED",
+            "order_id": order.id,
+            "restaurant_id": order.restaurant_id,
+            "status": order.status,
+            "total": float(order.total_amount),
+        })
+
+        # Server defaults come back via RETURNING and the items are already
+        # in memory, so no refresh is needed to build the response.
+        await db.commit()
+    except Exception:
+        # Give back the slot reserved by enforce_order_limit
+        await release_active_orders(restaurant_id)
+        raise
+
+    await bump_orders_version(restaurant_id)
     return order
 
-@router.get("/")
-def list_orders(
-    db: Session = Depends(get_db),
+@router.post("/bulk", response_model=BulkOrderResponse)
+async def create_orders_bulk(
+    orders: list[Any] = Body(..., max_length=MAX_BULK_ORDERS),
+    db: AsyncSession = Depends(get_db),
+    user=Depends(require_role("owner", "manager")),
+):
+    # Payloads are validated one by one so a bad order is reported in its
+    # result instead of rejecting the whole batch with 422.
+    return await ingest_orders(db, orders)
+
+@router.get("/board", response_model=OrderBoardOut)
+async def order_board(
+    db: AsyncSession = Depends(get_db),
     user=Depends(require_role("owner", "manager", "kitchen")),
 ):
-    return db.query(Order).all()
+    # Active orders straight from Redis; open the restaurant socket with
+    # last_event_id to pick up from this snapshot.
+    return await get_order_board(db, restaurant_scope(user))
+
+@router.get("/", response_model=OrderPage)
+async def list_orders(
+    request: Request,
+    response: Response,
+    cursor: int | None = None,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    status: OrderStatus | None = None,
+    payment_status: PaymentStatus | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    db: AsyncSession = Depends(get_read_db),
+    user=Depends(require_role("owner", "manager", "kitchen")),
+):
+    restaurant_id = restaurant_scope(user)
+    cached = await not_modified(orders_version_key(restaurant_id), request, response)
+    if cached is not None:
+        return cached
+
+    # Newest first, keyset on id: pass the returned next_cursor to get
+    # the following page. Cost stays flat however deep the history is.
+    query = (
+        select(Order)
+        .options(selectinload(Order.items))
+        .where(Order.restaurant_id == restaurant_id)
+    )
+
+    if cursor is not None:
+        query = query.where(Order.id < cursor)
+    if status is not None:
+        query = query.where(Order.status == status.value)
+    if payment_status is not None:
+        query = query.where(Order.payment_status == payment_status.value)
+    if created_from is not None:
+        query = query.where(Order.created_at >= created_from)
+    if created_to is not None:
+        query = query.where(Order.created_at < created_to)
+
+    result = await db.scalars(query.order_by(Order.id.desc()).limit(limit + 1))
+    orders = result.all()
+
+    next_cursor = orders[limit - 1].id if len(orders) > limit else None
+
+    return {
+        "items": orders[:limit],
+        "next_cursor": next_cursor,
+    }
@@ -1,31 +1,44 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
 from app.models.order import Order
 from app.domain.payment_states import PaymentStatus
 from app.core.permissions import require_role
+from app.schemas.order import OrderOut
+from app.services.idempotency import idempotent
+from app.services.resource_versions import bump_orders_version
 
 router = APIRouter(prefix="/payments", tags=["payments"])
 
-@router.post("/{order_id}/authorize")
-def authorize_payment(
+@router.post("/{order_id}/authorize", response_model=OrderOut)
+@idempotent
+async def authorize_payment(
     order_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user=Depends(require_role("owner", "manager")),
 ):
-    order = db.get(Order, order_id)
+    order = await db.get(Order, order_id)
+    if not order:
+        raise HTTPException(status_code=404)
+
     order.payment_status = PaymentStatus.AUTHORIZED.value
-    db.commit()
+    await db.commit()
+    await bump_orders_version(order.restaurant_id)
     return order
 
-@router.post("/{order_id}/capture")
-def capture_payment(
+@router.post("/{order_id}/capture", response_model=OrderOut)
+@idempotent
+async def capture_payment(
     order_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user=Depends(require_role("owner", "manager")),
 ):
-    order = db.get(Order, order_id)
+    order = await db.get(Order, order_id)
+    if not order:
+        raise HTTPException(status_code=404)
+
     order.payment_status = PaymentStatus.PAID.value
-    db.commit()
+    await db.commit()
+    await bump_orders_version(order.restaurant_id)
     return order
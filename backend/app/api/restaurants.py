@@ -1,27 +1,41 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.replicas import get_read_db
 from app.db.session import get_db
 from app.models.restaurant import Restaurant
 from app.core.permissions import require_role
+from app.services.restaurant_cache import invalidate_restaurant
+from app.services.resource_versions import RESTAURANTS_VERSION_KEY, bump_versions, not_modified
 
 router = APIRouter(prefix="/restaurants", tags=["restaurants"])
 
 @router.post("/")
-def create_restaurant(
+async def create_restaurant(
     name: str,
     owner_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user=Depends(require_role("owner")),
 ):
     restaurant = Restaurant(name=name, owner_id=owner_id)
     db.add(restaurant)
-    db.commit()
-    db.refresh(restaurant)
+    await db.commit()
+    await db.refresh(restaurant)
+    await invalidate_restaurant(restaurant.id, restaurant.owner_id)
+    await bump_versions(RESTAURANTS_VERSION_KEY)
     return restaurant
 
 @router.get("/")
-def list_restaurants(
-    db: Session = Depends(get_db),
+async def list_restaurants(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     user=Depends(require_role("owner", "manager")),
 ):
-    return db.query(Restaurant).all()
+    # The list is global, so it has one version for everyone
+    cached = await not_modified(RESTAURANTS_VERSION_KEY, request, response)
+    if cached is not None:
+        return cached
+
+    result = await db.scalars(select(Restaurant))
+    return result.all()
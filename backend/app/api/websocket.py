@@ -1,28 +1,57 @@
-import asyncio
-import json
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+import logging
+from typing import Optional
 
-from app.websocket.manager import ConnectionManager
-from app.infrastructure.redis import redis_client
-from app.infrastructure.event_bus import ORDER_CHANNEL
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
+
+from app.core.config import settings
+from app.infrastructure.event_bus import read_order_events
+from app.websocket.manager import RESYNC_FRAME, manager
+from app.websocket.subscriber import order_event_subscriber
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
-manager = ConnectionManager()
 
 @router.websocket("/ws/restaurants/{restaurant_id}")
-async def restaurant_ws(websocket: WebSocket, restaurant_id: int):
-    await manager.connect(restaurant_id, websocket)
+async def restaurant_ws(
+    websocket: WebSocket,
+    restaurant_id: int,
+    batch: bool = False,
+    last_event_id: Optional[str] = Query(None, pattern=r"^\d+-\d+$"),
+):
+    # ?batch=1 opts in to array frames of coalesced events; without it
+    # every event is its own frame as before.
+    batch_window = settings.WS_BATCH_WINDOW_MS / 1000 if batch else None
+    connection = await manager.connect(
+        restaurant_id,
+        websocket,
+        batch_window,
+        resuming=last_event_id is not None,
+    )
+    live = await order_event_subscriber.sync(restaurant_id)
 
-    pubsub = redis_client.pubsub()
-    pubsub.subscribe(ORDER_CHANNEL)
+    if last_event_id is not None:
+        # With the subscription confirmed before the stream read nothing
+        # falls in between; live events already replayed are skipped.
+        # Without it the client has to refetch, and is told again once
+        # the subscriber has caught up.
+        missed = None
+        if live:
+            try:
+                missed = await read_order_events(restaurant_id, last_event_id)
+            except Exception:
+                logger.exception("Failed to read event stream for restaurant %s", restaurant_id)
+        if missed is None:
+            missed = [(None, RESYNC_FRAME)]
+        connection.replay(missed)
 
+    # Events are pushed by the worker's shared OrderEventSubscriber;
+    # this loop only keeps the socket open until the client leaves.
     try:
         while True:
-            message = pubsub.get_message(ignore_subscribe_messages=True)
-            if message:
-                data = json.loads(message["data"])
-                if data["restaurant_id"] == restaurant_id:
-                    await manager.broadcast(restaurant_id, data)
-            await asyncio.sleep(0.05)
+            await websocket.receive_text()
     except WebSocketDisconnect:
-        manager.disconnect(restaurant_id, websocket)
+        pass
+    finally:
+        manager.disconnect(restaurant_id, connection)
+        await order_event_subscriber.sync(restaurant_id)
@@ -1,3 +1,5 @@
+import multiprocessing
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -7,7 +9,85 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
 
+    # Comma-separated read replicas; empty sends every read to the primary
+    DATABASE_REPLICA_URLS: str = ""
+    # Replicas further behind than this are skipped until they catch up
+    REPLICA_MAX_LAG_SECONDS: float = 2.0
+    REPLICA_LAG_CHECK_INTERVAL_SECONDS: float = 1.0
+    # After a successful write a client reads from the primary for this
+    # long; keep it above REPLICA_MAX_LAG_SECONDS.
+    READ_YOUR_WRITES_SECONDS: int = 5
+
+    # Connections every web worker together may hold on one Postgres
+    # server (primary or replica). Keep it under max_connections with room
+    # for the background workers, migrations and admin sessions.
+    DB_CONNECTION_BUDGET: int = 100
+    # Part of each worker's share held back as burst-only overflow
+    DB_POOL_OVERFLOW_RATIO: float = 0.25
+    DB_POOL_TIMEOUT_SECONDS: float = 10.0
+    # Checkouts waiting longer than this are logged with the pool status
+    DB_POOL_SLOW_CHECKOUT_MS: int = 100
+    # Behind PgBouncer in transaction mode: no app-side pool and no
+    # prepared statement caching
+    DB_PGBOUNCER: bool = False
+
+    # Gunicorn workers; 0 means cpu_count() * 2 + 1
+    WEB_CONCURRENCY: int = 0
+
+    # Trust the signed token claims instead of loading the user on every
+    # request; revocation goes through the Redis deny list.
+    AUTH_STATELESS: bool = False
+
+    # Changing the rounds rehashes passwords transparently on next login
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    # Hash/verify jobs allowed in flight per worker before answering 503
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    REDIS_URL: str = "redis://redis:6379/0"
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT_SECONDS: float = 5.0
+
+    # Approximate cap on each restaurant's replayable event stream
+    ORDER_STREAM_MAXLEN: int = 1000
+
+    OUTBOX_BATCH_SIZE: int = 500
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 0.1
+    # Prometheus endpoint of the relay process (publish metrics); 0 disables
+    OUTBOX_RELAY_METRICS_PORT: int = 9100
+
+    ACTIVE_ORDERS_RECONCILE_INTERVAL_SECONDS: float = 300
+    # A counter is only corrected if it differs from Postgres the same way
+    # twice this far apart; in-flight creates and transitions settle first.
+    ACTIVE_ORDERS_RECONCILE_SETTLE_SECONDS: float = 5
+
+    # Per-worker restaurant cache, kept fresh by Redis invalidations; the
+    # TTL only matters for changes made outside the API
+    RESTAURANT_CACHE_SIZE: int = 10000
+    RESTAURANT_CACHE_TTL_SECONDS: float = 300
+
+    # Successful responses to requests with an Idempotency-Key are
+    # replayed for this long
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    # The first request's claim on a key; a duplicate arriving after this
+    # runs again, so keep it above the slowest create/payment request.
+    IDEMPOTENCY_LOCK_SECONDS: int = 30
+    # How long a duplicate waits for the first request before a 409
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0
+
+    # Per-socket outgoing queue; overflow policy is one of
+    # drop_oldest | coalesce | disconnect
+    WS_SEND_QUEUE_SIZE: int = 256
+    WS_OVERFLOW_POLICY: str = "drop_oldest"
+    # Window for sockets that opt in with ?batch=1
+    WS_BATCH_WINDOW_MS: int = 250
+
     class Config:
         env_file = ".env"
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
+
+
+def web_concurrency() -> int:
+    # Shared by gunicorn.conf.py and the pool sizing so they agree
+    return settings.WEB_CONCURRENCY or multiprocessing.cpu_count() * 2 + 1
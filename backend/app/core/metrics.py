@@ -0,0 +1,131 @@
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Under gunicorn every worker writes its samples to PROMETHEUS_MULTIPROC_DIR
+# (set in gunicorn.conf.py) and /metrics merges them, so any worker can
+# answer a scrape for the whole server.
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+ORDER_TRANSITIONS = Counter(
+    "order_transitions_total",
+    "Order status changes",
+    ["from_status", "to_status"],
+)
+
+ORDER_TRANSITION_DURATION = Histogram(
+    "order_transition_duration_seconds",
+    "Time a transition spends in Postgres (update, outbox, commit) and Redis",
+    ["to_status", "phase"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+
+EVENT_PUBLISH_DURATION = Histogram(
+    "order_event_publish_duration_seconds",
+    "Time to publish one batch of order events to Redis",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+
+EVENTS_PUBLISHED = Counter(
+    "order_events_published_total",
+    "Order events published to Redis",
+)
+
+# Wall clock from publish to socket send, so it includes clock skew
+# between the publishing and the sending host.
+WS_DELIVERY_LAG = Histogram(
+    "ws_delivery_lag_seconds",
+    "Time from event publish to WebSocket send",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+# Labelled by pool logging name (primary, replica-N); under gunicorn the
+# gauges are summed over live workers.
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time a checkout waits for a connection, including opening one",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT_SECONDS",
+    ["pool"],
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Connections currently in use",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections",
+    "Connections open beyond pool_size",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+
+WS_ACTIVE_CONNECTIONS = Gauge(
+    "ws_active_connections",
+    "Open dashboard sockets per worker",
+    multiprocess_mode="liveall",
+)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """Records request latency labelled by the matched route template,
+    so /orders/actions/{order_id}/pay is one series, not one per order."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                str(status_code),
+            ).observe(time.perf_counter() - start)
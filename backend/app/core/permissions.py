@@ -3,7 +3,7 @@ from app.models.user import User
 from app.api.deps import get_current_user
 
 def require_role(*roles: str):
-    def checker(user: User = Depends(get_current_user)):
+    async def checker(user: User = Depends(get_current_user)):
         if user.role not in roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -11,3 +11,12 @@ def require_role(*roles: str):
             )
         return user
     return checker
+
+def restaurant_scope(user: User) -> int:
+    # Tenant the caller's token is bound to; reads are limited to it
+    if user.restaurant_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No restaurant associated with this account",
+        )
+    return user.restaurant_id
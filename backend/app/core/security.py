@@ -1,11 +1,30 @@
+import asyncio
+import logging
+import multiprocessing
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta, timezone
+from typing import Optional
+from fastapi import HTTPException, status
 from jose import jwt, JWTError, ExpiredSignatureError
 from passlib.context import CryptContext
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+)
 ALGORITHM = "HS256"
 
+logger = logging.getLogger(__name__)
+
+# bcrypt is pure CPU; it runs in a small per-worker process pool so a burst
+# of logins cannot stall the event loop or the threadpool.
+_password_pool: Optional[ProcessPoolExecutor] = None
+_password_jobs_pending = 0
+
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -15,12 +34,87 @@ def verify_password(password: str, hashed: str) -> bool:
     return pwd_context.verify(password, hashed)
 
 
+def verify_and_update(password: str, hashed: str) -> tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed)
+
+
+def _get_password_pool() -> ProcessPoolExecutor:
+    global _password_pool
+    if _password_pool is None:
+        _password_pool = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _password_pool
+
+
+def _discard_password_pool(pool: ProcessPoolExecutor):
+    # Only if no concurrent job has already replaced it
+    global _password_pool
+    if _password_pool is pool:
+        _password_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_password_pool():
+    global _password_pool
+    if _password_pool is not None:
+        _password_pool.shutdown(wait=False, cancel_futures=True)
+        _password_pool = None
+
+
+async def _run_password_job(fn, *args):
+    global _password_jobs_pending
+    if _password_jobs_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent sign-ins, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+
+    _password_jobs_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        # A child killed from outside (e.g. by the OOM killer) breaks the
+        # whole pool; replace it and retry once before giving up.
+        for attempt in range(2):
+            pool = _get_password_pool()
+            try:
+                return await loop.run_in_executor(pool, fn, *args)
+            except BrokenProcessPool:
+                _discard_password_pool(pool)
+                logger.warning("Password hash pool broke, replacing it (attempt %d)", attempt + 1)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Sign-in is temporarily unavailable, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+    finally:
+        _password_jobs_pending -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_password_job(hash_password, password)
+
+
+async def verify_password_async(password: str, hashed: str) -> tuple[bool, Optional[str]]:
+    """Verify off the event loop; also returns a new hash when the stored
+    one uses outdated bcrypt settings, else None."""
+    return await _run_password_job(verify_and_update, password, hashed)
+
+
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(
+    now = datetime.now(timezone.utc)
+    expire = now + timedelta(
         minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
     )
-    to_encode.update({"exp": expire})
+    to_encode.update({
+        "exp": expire,
+        "iat": now,
+        # Lets a single token be revoked in stateless auth mode
+        "jti": uuid.uuid4().hex,
+    })
     return jwt.encode(
         to_encode,
         settings.SECRET_KEY,
@@ -0,0 +1,153 @@
+import logging
+import time
+from uuid import uuid4
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+
+from app.core.config import settings, web_concurrency
+from app.core.metrics import (
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_CHECKOUT_TIMEOUTS,
+    DB_POOL_CHECKOUT_WAIT,
+    DB_POOL_OVERFLOW,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStats:
+    """Checkout counters for one engine's pool in this worker, for
+    /health/db-pool; the same figures go to Prometheus for the whole
+    server."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.slow_checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, wait: float, timed_out: bool = False):
+        if timed_out:
+            self.timeouts += 1
+        else:
+            self.checkouts += 1
+        self.wait_seconds_total += wait
+        self.wait_seconds_max = max(self.wait_seconds_max, wait)
+
+
+# Keyed by the pool's logging name; kept outside the pool so the numbers
+# survive Pool.recreate() on dispose or invalidation.
+pool_stats: dict[str, PoolStats] = {}
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that times how long each checkout waits for a
+    connection, including opening a new one, and tracks occupancy."""
+
+    def _do_get(self):
+        name = self._orig_logging_name
+        stats = pool_stats.setdefault(name, PoolStats())
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            wait = time.perf_counter() - start
+            stats.record(wait, timed_out=True)
+            DB_POOL_CHECKOUT_WAIT.labels(name).observe(wait)
+            DB_POOL_CHECKOUT_TIMEOUTS.labels(name).inc()
+            logger.error("Pool %s exhausted: %s", name, self.status())
+            raise
+
+        wait = time.perf_counter() - start
+        stats.record(wait)
+        DB_POOL_CHECKOUT_WAIT.labels(name).observe(wait)
+        self._observe_occupancy()
+        if wait * 1000 >= settings.DB_POOL_SLOW_CHECKOUT_MS:
+            stats.slow_checkouts += 1
+            logger.warning(
+                "Pool %s checkout waited %.0f ms: %s",
+                name,
+                wait * 1000,
+                self.status(),
+            )
+        return connection
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self._observe_occupancy()
+
+    def _observe_occupancy(self):
+        DB_POOL_CHECKED_OUT.labels(self._orig_logging_name).set(self.checkedout())
+        DB_POOL_OVERFLOW.labels(self._orig_logging_name).set(max(self.overflow(), 0))
+
+
+def pool_limits(budget: int, workers: int, overflow_ratio: float) -> tuple[int, int]:
+    """(pool_size, max_overflow) so that all workers together stay
+    within ``budget`` connections."""
+    per_worker = max(budget // workers, 1)
+    max_overflow = int(per_worker * overflow_ratio)
+    return max(per_worker - max_overflow, 1), max_overflow
+
+
+def engine_options(url: str, name: str) -> dict:
+    """Keyword arguments for create_async_engine on ``url``."""
+    options = {"pool_pre_ping": True, "pool_logging_name": name}
+
+    if settings.DB_PGBOUNCER:
+        # PgBouncer owns the pooling; prepared statements do not survive
+        # a transaction-mode server switch, so none are cached and names
+        # are unique per statement.
+        options["poolclass"] = NullPool
+        if make_url(url).drivername == "postgresql+asyncpg":
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+        return options
+
+    workers = web_concurrency()
+    if settings.DB_CONNECTION_BUDGET < workers:
+        logger.warning(
+            "DB_CONNECTION_BUDGET %d is below %d workers; each still gets one connection",
+            settings.DB_CONNECTION_BUDGET,
+            workers,
+        )
+    pool_size, max_overflow = pool_limits(
+        settings.DB_CONNECTION_BUDGET,
+        workers,
+        settings.DB_POOL_OVERFLOW_RATIO,
+    )
+    logger.info("Pool %s: size %d, overflow %d", name, pool_size, max_overflow)
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    )
+    return options
+
+
+def pool_status(engine) -> dict:
+    """Occupancy and checkout stats of an engine's pool in this worker."""
+    pool = engine.sync_engine.pool
+    if not isinstance(pool, InstrumentedQueuePool):
+        return {"pool": type(pool).__name__}
+
+    stats = pool_stats.get(pool._orig_logging_name, PoolStats())
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+        "checkouts": stats.checkouts,
+        "timeouts": stats.timeouts,
+        "slow_checkouts": stats.slow_checkouts,
+        "wait_seconds_total": round(stats.wait_seconds_total, 6),
+        "wait_seconds_max": round(stats.wait_seconds_max, 6),
+    }
@@ -0,0 +1,143 @@
+import asyncio
+import itertools
+import logging
+import math
+import time
+from typing import Optional
+
+from fastapi import Depends, Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.db.pool import engine_options
+from app.db.session import async_database_url, get_db
+
+logger = logging.getLogger(__name__)
+
+# Set after a successful write so the client's next reads see it
+READ_PRIMARY_COOKIE = "read_primary"
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Seconds behind the primary; 0 when everything received is replayed,
+# which keeps an idle primary from looking like lag. NULL (not a
+# standby) also counts as 0.
+LAG_QUERY = text("""
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+LAG_QUERY_TIMEOUT_SECONDS = 1.0
+
+
+class Replica:
+    def __init__(self, url: str, name: str):
+        self.url = url
+        self.name = name
+        async_url = async_database_url(url)
+        self.engine = create_async_engine(async_url, **engine_options(async_url, name))
+        self.SessionLocal = async_sessionmaker(
+            bind=self.engine,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+        self.lag = 0.0
+        self.checked_at = -math.inf
+        self._lock = asyncio.Lock()
+
+    async def is_fresh(self, max_lag: float, check_interval: float) -> bool:
+        # One request per interval pays for the check; the others use the
+        # last reading instead of queueing behind it.
+        if time.monotonic() - self.checked_at > check_interval and not self._lock.locked():
+            async with self._lock:
+                self.lag = await self._measure_lag()
+                self.checked_at = time.monotonic()
+        return self.lag <= max_lag
+
+    async def _measure_lag(self) -> float:
+        try:
+            async with self.engine.connect() as conn:
+                lag = await asyncio.wait_for(
+                    conn.scalar(LAG_QUERY),
+                    timeout=LAG_QUERY_TIMEOUT_SECONDS,
+                )
+            return float(lag or 0)
+        except Exception:
+            logger.warning("Replica lag check failed for %s", self.name, exc_info=True)
+            return math.inf
+
+
+class ReplicaRouter:
+    """Round-robins reads over the replicas that are within the lag
+    budget; None means read from the primary."""
+
+    def __init__(self, urls: list[str], max_lag: float, check_interval: float):
+        self.replicas = [Replica(url, f"replica-{index}") for index, url in enumerate(urls)]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._next = itertools.count()
+
+    async def pick(self) -> Optional[Replica]:
+        start = next(self._next)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if await replica.is_fresh(self.max_lag, self.check_interval):
+                return replica
+        return None
+
+
+replica_router = ReplicaRouter(
+    [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()],
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.REPLICA_LAG_CHECK_INTERVAL_SECONDS,
+)
+
+
+async def get_read_db(request: Request, primary: AsyncSession = Depends(get_db)):
+    """Session for read-only work: a replica when one is fresh enough and
+    the client has not written recently, otherwise the primary.
+
+    Falls back to the request's ``get_db`` session, which only checks out
+    a connection when used, so endpoints that also write share it.
+    """
+    if not replica_router.replicas or request.cookies.get(READ_PRIMARY_COOKIE):
+        yield primary
+        return
+
+    replica = await replica_router.pick()
+    if replica is None:
+        yield primary
+        return
+
+    async with replica.SessionLocal() as db:
+        yield db
+
+
+class ReadYourWritesMiddleware:
+    """Sets READ_PRIMARY_COOKIE on successful non-GET responses so the
+    client's reads stay on the primary until replicas have caught up."""
+
+    def __init__(self, app, window_seconds: int = settings.READ_YOUR_WRITES_SECONDS):
+        self.app = app
+        self.cookie = (
+            f"{READ_PRIMARY_COOKIE}=1; Max-Age={window_seconds}; Path=/; HttpOnly; SameSite=lax"
+        ).encode()
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] in SAFE_METHODS
+            or not replica_router.replicas
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", self.cookie)]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
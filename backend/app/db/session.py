@@ -1,18 +1,33 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from app.core.config import settings
+from app.db.pool import engine_options
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
 
-SessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=False,
+def async_database_url(url: str) -> str:
+    # DATABASE_URL stays a plain postgresql:// URL for Alembic (psycopg2);
+    # the app talks to the same database through asyncpg.
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+DATABASE_URL = async_database_url(settings.DATABASE_URL)
+
+# Pool size comes from DB_CONNECTION_BUDGET split across the workers
+# (see app.db.pool), or no pool at all behind PgBouncer.
+engine = create_async_engine(DATABASE_URL, **engine_options(DATABASE_URL, "primary"))
+
+SessionLocal = async_sessionmaker(
     bind=engine,
+    autoflush=False,
+    expire_on_commit=False,
 )
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
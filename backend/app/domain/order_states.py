@@ -9,3 +9,8 @@ class OrderStatus(str, Enum):
     OUT_FOR_DELIVERY = "OUT_FOR_DELIVERY"
     COMPLETED = "COMPLETED"
     CANCELLED = "CANCELLED"
+
+TERMINAL_STATUSES = frozenset({
+    OrderStatus.COMPLETED,
+    OrderStatus.CANCELLED,
+})
@@ -23,3 +23,14 @@ VALID_TRANSITIONS = {
         OrderStatus.COMPLETED,
     },
 }
+
+# Reverse of VALID_TRANSITIONS: the statuses an order may be in for a move
+# to the key status. Lets a transition be a single conditional UPDATE.
+ALLOWED_PREDECESSORS = {
+    target: frozenset(
+        source
+        for source, targets in VALID_TRANSITIONS.items()
+        if target in targets
+    )
+    for target in OrderStatus
+}
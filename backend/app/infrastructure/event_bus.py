@@ -1,7 +1,113 @@
 import json
+import time
+
+from app.core.config import settings
+from app.core.metrics import EVENT_PUBLISH_DURATION, EVENTS_PUBLISHED
+from app.domain.order_states import TERMINAL_STATUSES
 from app.infrastructure.redis import redis_client
 
 ORDER_CHANNEL = "orders"
 
-def publish_order_event(event: dict):
-    redis_client.publish(ORDER_CHANNEL, json.dumps(event))
+# Appends the event to the restaurant's capped stream and publishes it
+# with the stream entry id as "event_id", so live and replayed events
+# carry the same id. A seeded live board (KEYS[3]) gets the event as the
+# order's entry, or loses the entry when ARGV[4] marks a terminal status.
+# Returns the id.
+PUBLISH_SCRIPT = """
+local id = redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[1], '*', 'event', ARGV[2])
+local text = '{"event_id":"' .. id .. '",' .. string.sub(ARGV[2], 2)
+redis.call('PUBLISH', KEYS[2], text)
+if ARGV[3] ~= '' and redis.call('EXISTS', KEYS[3]) == 1 then
+    if ARGV[4] == '1' then
+        redis.call('HDEL', KEYS[3], ARGV[3])
+    else
+        redis.call('HSET', KEYS[3], ARGV[3], text)
+    end
+end
+return id
+"""
+
+_publish = redis_client.register_script(PUBLISH_SCRIPT)
+
+
+def order_channel(restaurant_id: int) -> str:
+    # One channel per tenant so workers only receive events for
+    # restaurants that have sockets open on them.
+    return f"{ORDER_CHANNEL}:{restaurant_id}"
+
+
+def order_stream(restaurant_id: int) -> str:
+    return f"{ORDER_CHANNEL}:{restaurant_id}:stream"
+
+
+def order_board(restaurant_id: int) -> str:
+    return f"{ORDER_CHANNEL}:{restaurant_id}:board"
+
+
+async def read_order_events(
+    restaurant_id: int,
+    last_event_id: str | None = None,
+) -> list[tuple[str, str]] | None:
+    """Events published after ``last_event_id`` (or the whole stream) as
+    (event_id, text), or None if the stream no longer reaches back that far."""
+    entries = await redis_client.xrange(order_stream(restaurant_id), min=last_event_id or "-")
+    if last_event_id is not None:
+        # The range is inclusive: if the client's last event has been
+        # trimmed away there is a gap and it has to refetch instead.
+        if not entries or entries[0][0] != last_event_id:
+            return None
+        entries = entries[1:]
+
+    return [
+        (event_id, f'{{"event_id":"{event_id}",{fields["event"][1:]}')
+        for event_id, fields in entries
+    ]
+
+
+class EventBus:
+    """Async publisher for order events, used by the outbox relay.
+
+    ``publish``/``publish_many`` await Redis and send a whole batch in one
+    pipeline; every event is also appended to the restaurant's stream so
+    reconnecting sockets can replay what they missed.
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    async def publish(self, event: dict):
+        await self.publish_many([event])
+
+    async def publish_many(self, events: list[dict]):
+        if not events:
+            return
+
+        started = time.perf_counter()
+        published_at = time.time()
+        async with self.client.pipeline(transaction=False) as pipe:
+            for event in events:
+                # Lets subscribers measure delivery lag
+                event = {**event, "published_at": published_at}
+                restaurant_id = event["restaurant_id"]
+                order_id = event.get("order_id")
+                await _publish(
+                    keys=[
+                        order_stream(restaurant_id),
+                        order_channel(restaurant_id),
+                        order_board(restaurant_id),
+                    ],
+                    args=[
+                        settings.ORDER_STREAM_MAXLEN,
+                        json.dumps(event),
+                        "" if order_id is None else order_id,
+                        int(event.get("status") in TERMINAL_STATUSES),
+                    ],
+                    client=pipe,
+                )
+            await pipe.execute()
+
+        EVENT_PUBLISH_DURATION.observe(time.perf_counter() - started)
+        EVENTS_PUBLISHED.inc(len(events))
+
+
+event_bus = EventBus(redis_client)
@@ -0,0 +1,30 @@
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.order_event import OrderEvent
+
+def add_order_event(db: AsyncSession, event: dict):
+    # Added to the caller's session so the event commits (or rolls back)
+    # together with the order change that produced it.
+    db.add(OrderEvent(restaurant_id=event["restaurant_id"], payload=event))
+
+async def add_order_events(db: AsyncSession, events: list[dict]):
+    # Set-based variant for batch writers; same transactional guarantee.
+    await db.execute(
+        insert(OrderEvent),
+        [{"restaurant_id": event["restaurant_id"], "payload": event} for event in events],
+    )
+
+async def claim_order_events(db: AsyncSession, limit: int) -> list[OrderEvent]:
+    # SKIP LOCKED lets several relays drain the table without blocking
+    # on, or double-publishing, each other's batches.
+    result = await db.scalars(
+        select(OrderEvent)
+        .order_by(OrderEvent.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return list(result)
+
+async def delete_order_events(db: AsyncSession, event_ids: list[int]):
+    await db.execute(delete(OrderEvent).where(OrderEvent.id.in_(event_ids)))
@@ -1,8 +1,11 @@
-import redis
+import redis.asyncio as redis
 from app.core.config import settings
 
-redis_client = redis.Redis(
-    host="localhost",
-    port=6379,
+redis_pool = redis.BlockingConnectionPool.from_url(
+    settings.REDIS_URL,
+    max_connections=settings.REDIS_MAX_CONNECTIONS,
+    timeout=settings.REDIS_POOL_TIMEOUT_SECONDS,
     decode_responses=True,
 )
+
+redis_client = redis.Redis(connection_pool=redis_pool)
@@ -1,15 +1,43 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.health import router as health_router
+from app.api.metrics import router as metrics_router
 from app.api.auth import router as auth_router
 from app.api.restaurants import router as restaurant_router
 from app.api.orders import router as order_router
 from app.api.order_actions import router as order_actions_router
+from app.api.bulk_order_actions import router as bulk_order_actions_router
 from app.api.websocket import router as websocket_router
 from app.api.payment_actions import router as payment_router
+from app.core.metrics import MetricsMiddleware
+from app.core.security import shutdown_password_pool
+from app.db.replicas import ReadYourWritesMiddleware
+from app.services.idempotency import IdempotencyMiddleware
+from app.websocket.subscriber import order_event_subscriber
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    order_event_subscriber.start()
+    yield
+    await order_event_subscriber.stop()
+    shutdown_password_pool()
+
 
-app = FastAPI(title="Food Ordering Backend")
+app = FastAPI(
+    title="Food Ordering Backend",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
+
+# Innermost: a replayed response still passes through the others
+app.add_middleware(IdempotencyMiddleware)
+
+app.add_middleware(ReadYourWritesMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,10 +47,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Added last so it is outermost and the latency covers the other middleware
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(health_router)
+app.include_router(metrics_router)
 app.include_router(auth_router)
 app.include_router(restaurant_router)
 app.include_router(order_router)
+# Before order_actions so /bulk/... is not captured by /{order_id}/...
+app.include_router(bulk_order_actions_router)
 app.include_router(order_actions_router)
 app.include_router(websocket_router)
 app.include_router(payment_router)
\ No newline at end of file
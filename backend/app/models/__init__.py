@@ -1,4 +1,5 @@
 from app.models.user import User
 from app.models.restaurant import Restaurant
 from app.models.order import Order
-from app.models.order_item import OrderItem
\ No newline at end of file
+from app.models.order_item import OrderItem
+from app.models.order_event import OrderEvent
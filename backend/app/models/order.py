@@ -1,4 +1,6 @@
-from sqlalchemy import ForeignKey, String, Numeric
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import DateTime, ForeignKey, Index, String, Numeric, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base_class import Base
 from app.domain.order_states import OrderStatus
@@ -6,6 +8,21 @@ from app.domain.payment_states import PaymentStatus
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Tenant-scoped keyset pagination for GET /orders and its filters
+        Index("ix_orders_restaurant_id_id", "restaurant_id", "id"),
+        Index("ix_orders_restaurant_id_status_id", "restaurant_id", "status", "id"),
+        Index("ix_orders_restaurant_id_payment_status_id", "restaurant_id", "payment_status", "id"),
+        Index("ix_orders_restaurant_id_created_at", "restaurant_id", "created_at"),
+        # Active orders only: plan limits, the live board and reconciling
+        Index(
+            "ix_orders_restaurant_id_status_active",
+            "restaurant_id",
+            "status",
+            postgresql_where=text("status NOT IN ('COMPLETED', 'CANCELLED')"),
+            sqlite_where=text("status NOT IN ('COMPLETED', 'CANCELLED')"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
@@ -18,7 +35,6 @@ class Order(Base):
     status: Mapped[str] = mapped_column(
         String(50),
         default=OrderStatus.CREATED.value,
-        index=True,
     )
 
     total_amount: Mapped[float] = mapped_column(Numeric(10, 2), default=0)
@@ -26,7 +42,12 @@ class Order(Base):
     payment_status: Mapped[str] = mapped_column(
         String(20),
         default=PaymentStatus.PENDING.value,
-        index=True,
+    )
+
+    # NULL for orders placed before the column existed
+    created_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
     )
 
     restaurant = relationship("Restaurant", back_populates="orders")
@@ -0,0 +1,21 @@
+from datetime import datetime
+from sqlalchemy import BigInteger, DateTime, Integer, JSON, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base_class import Base
+
+class OrderEvent(Base):
+    """Transactional outbox row, drained to Redis by the outbox relay."""
+
+    __tablename__ = "order_events"
+
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+    )
+    restaurant_id: Mapped[int] = mapped_column()
+    payload: Mapped[dict] = mapped_column(JSON)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+    )
@@ -8,7 +8,8 @@ class OrderItem(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
 
     order_id: Mapped[int] = mapped_column(
-        ForeignKey("orders.id", ondelete="CASCADE")
+        ForeignKey("orders.id", ondelete="CASCADE"),
+        index=True,
     )
 
     product_name: Mapped[str] = mapped_column(String(255))
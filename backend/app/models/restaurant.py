@@ -13,7 +13,6 @@ class Restaurant(Base):
     plan: Mapped[str] = mapped_column(
         String(20),
         default=Plan.FREE.value,
-        index=True,
     )
 
     orders = relationship("Order", back_populates="restaurant")
@@ -0,0 +1,86 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Any, List, Optional
+
+
+class OrderItemOut(BaseModel):
+    id: int
+    product_name: str
+    quantity: int
+    unit_price: float
+
+    class Config:
+        from_attributes = True
+
+
+class OrderOut(BaseModel):
+    id: int
+    restaurant_id: int
+    user_id: int
+    status: str
+    payment_status: str
+    total_amount: float
+    created_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
+class OrderWithItemsOut(OrderOut):
+    items: List[OrderItemOut]
+
+
+class OrderPage(BaseModel):
+    items: List[OrderWithItemsOut]
+    next_cursor: Optional[int]
+
+
+class BoardOrderOut(BaseModel):
+    order_id: int
+    status: str
+    total: Optional[float] = None
+    event_id: Optional[str] = None
+
+
+class OrderBoardOut(BaseModel):
+    orders: List[BoardOrderOut]
+    last_event_id: Optional[str]
+
+
+class OrderItemIn(BaseModel):
+    product_name: str = Field(min_length=1, max_length=255)
+    quantity: int = Field(1, gt=0)
+    unit_price: float = Field(ge=0)
+
+
+class OrderIn(BaseModel):
+    restaurant_id: int
+    user_id: int
+    items: List[OrderItemIn]
+
+
+class BulkOrderResult(BaseModel):
+    index: int
+    status_code: int
+    order_id: Optional[int] = None
+    detail: Optional[Any] = None
+
+
+class BulkOrderResponse(BaseModel):
+    created: int
+    results: List[BulkOrderResult]
+
+
+class BulkTransitionRequest(BaseModel):
+    order_ids: List[int] = Field(min_length=1, max_length=500)
+
+
+class BulkTransitionResult(BaseModel):
+    order_id: int
+    status_code: int
+    status: Optional[str] = None
+
+
+class BulkTransitionResponse(BaseModel):
+    updated: int
+    results: List[BulkTransitionResult]
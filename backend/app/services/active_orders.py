@@ -0,0 +1,169 @@
+import asyncio
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.domain.order_states import TERMINAL_STATUSES
+from app.infrastructure.redis import redis_client
+from app.models.order import Order
+from app.models.restaurant import Restaurant
+
+# Per-restaurant count of non-terminal orders, kept next to the event bus
+# in Redis so the plan limit check on POST /orders is O(1).
+ACTIVE_ORDERS_KEY = "restaurants:{restaurant_id}:active_orders"
+
+# Returns the number of slots granted (a negative limit means unlimited)
+# or -2 if the counter is not seeded. With ARGV[3] == 1 as many slots as
+# still fit are granted, otherwise all or nothing.
+RESERVE_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if not current then
+    return -2
+end
+local limit = tonumber(ARGV[1])
+local count = tonumber(ARGV[2])
+if limit >= 0 then
+    local available = math.max(limit - tonumber(current), 0)
+    if count > available then
+        if ARGV[3] ~= '1' then
+            return 0
+        end
+        count = available
+    end
+end
+if count > 0 then
+    redis.call('INCRBY', KEYS[1], count)
+end
+return count
+"""
+
+# Never creates the key: an unseeded counter is rebuilt from Postgres.
+RELEASE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return nil
+end
+local value = redis.call('DECRBY', KEYS[1], ARGV[1])
+if value < 0 then
+    redis.call('SET', KEYS[1], 0)
+    return 0
+end
+return value
+"""
+
+# Compare-and-set: only overwrites a counter still holding ARGV[1]
+# ('' for a missing key), so slots reserved or released since it was
+# read are never lost.
+CORRECT_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if (current or '') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2])
+return 1
+"""
+
+_reserve = redis_client.register_script(RESERVE_SCRIPT)
+_release = redis_client.register_script(RELEASE_SCRIPT)
+_correct = redis_client.register_script(CORRECT_SCRIPT)
+
+
+def active_orders_key(restaurant_id: int) -> str:
+    return ACTIVE_ORDERS_KEY.format(restaurant_id=restaurant_id)
+
+
+def _active_orders_query():
+    return (
+        select(Order.restaurant_id, func.count())
+        .where(Order.status.notin_([s.value for s in TERMINAL_STATUSES]))
+        .group_by(Order.restaurant_id)
+    )
+
+
+async def count_active_orders(db: AsyncSession, restaurant_id: int) -> int:
+    result = await db.execute(
+        _active_orders_query().where(Order.restaurant_id == restaurant_id)
+    )
+    row = result.first()
+    return row[1] if row else 0
+
+
+async def reserve_active_orders(
+    db: AsyncSession,
+    restaurant_id: int,
+    limit: int | None,
+    count: int = 1,
+    partial: bool = False,
+) -> int:
+    """Atomically check the limit and reserve active-order slots.
+
+    Returns how many of the ``count`` slots were granted: ``count`` or 0,
+    or anything in between when ``partial`` is set.
+    """
+    key = active_orders_key(restaurant_id)
+    args = [-1 if limit is None else limit, count, int(partial)]
+
+    result = await _reserve(keys=[key], args=args)
+    if result == -2:
+        # First use since a Redis flush: seed from Postgres. NX keeps a
+        # concurrent seeder's value (and any reservations made on it).
+        await redis_client.set(key, await count_active_orders(db, restaurant_id), nx=True)
+        result = await _reserve(keys=[key], args=args)
+
+    return max(result, 0)
+
+
+async def release_active_orders(restaurant_id: int, count: int = 1):
+    await _release(keys=[active_orders_key(restaurant_id)], args=[count])
+
+
+async def _drift(db: AsyncSession, restaurant_ids=None) -> dict[int, tuple[str, int]]:
+    """Restaurants whose counter differs from Postgres, with the counter
+    as read ('' if missing) and the count. Redis is read first, so a
+    write that lands in between shows up as a changed counter."""
+    if restaurant_ids is None:
+        restaurant_ids = (await db.scalars(select(Restaurant.id))).all()
+    restaurant_ids = list(restaurant_ids)
+    if not restaurant_ids:
+        return {}
+
+    counters = await redis_client.mget([active_orders_key(r) for r in restaurant_ids])
+    counts = dict.fromkeys(restaurant_ids, 0)
+    counts.update(
+        (await db.execute(
+            _active_orders_query().where(Order.restaurant_id.in_(restaurant_ids))
+        )).tuples().all()
+    )
+    await db.rollback()
+
+    return {
+        restaurant_id: (counter or "", counts[restaurant_id])
+        for restaurant_id, counter in zip(restaurant_ids, counters)
+        if counter is None or int(counter) != counts[restaurant_id]
+    }
+
+
+async def reconcile_active_orders(db: AsyncSession) -> int:
+    """Reset drifted counters to the true count in Postgres; returns how
+    many were corrected.
+
+    A create that has reserved but not committed, or a terminal
+    transition that has committed but not released, looks like drift
+    for a moment. So a difference is only corrected if it is still the
+    same, with the counter untouched, after
+    ACTIVE_ORDERS_RECONCILE_SETTLE_SECONDS, and then only if the counter
+    has not moved since (CORRECT_SCRIPT).
+    """
+    suspects = await _drift(db)
+    if not suspects:
+        return 0
+
+    await asyncio.sleep(settings.ACTIVE_ORDERS_RECONCILE_SETTLE_SECONDS)
+    confirmed = await _drift(db, suspects)
+
+    corrected = 0
+    for restaurant_id, (counter, active) in confirmed.items():
+        if suspects[restaurant_id] != (counter, active):
+            continue
+        corrected += await _correct(keys=[active_orders_key(restaurant_id)], args=[counter, active])
+    return corrected
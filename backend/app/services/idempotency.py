@@ -0,0 +1,274 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import uuid
+from http.cookies import SimpleCookie
+
+from jose import JWTError, jwt
+from sqlalchemy import select
+from starlette.routing import Match
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.infrastructure.redis import redis_client
+from app.models.user import User
+from app.services.token_denylist import is_token_revoked
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+REPLAYED_HEADER = b"idempotent-replayed"
+MAX_KEY_LENGTH = 255
+
+# Scoped to the caller so one client's key can never return another's
+# response. Holds a pending marker while the first request runs, then
+# the stored response.
+IDEMPOTENCY_KEY = "idempotency:{user_id}:{method}:{path}:{key}"
+
+# Stores the result (or drops the key when ARGV[2] is empty) only while
+# this request's own pending marker is still there, so a request whose
+# marker expired cannot overwrite the one that took over.
+FINISH_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+if ARGV[2] == '' then
+    redis.call('DEL', KEYS[1])
+else
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+end
+return 1
+"""
+
+_finish = redis_client.register_script(FINISH_SCRIPT)
+
+POLL_INTERVAL_SECONDS = 0.05
+
+# Never replayed, so headers that belong to one response only are dropped
+STORED_HEADERS = {b"content-type", b"location"}
+
+
+def idempotent(endpoint):
+    """Mark an endpoint as honouring the Idempotency-Key header."""
+    endpoint.idempotent = True
+    return endpoint
+
+
+def _fingerprint(scope, body: bytes) -> str:
+    digest = hashlib.sha256()
+    digest.update(scope["method"].encode())
+    digest.update(scope["path"].encode())
+    digest.update(scope.get("query_string", b""))
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def _json_response(status_code: int, detail: str, headers=()):
+    body = json.dumps({"detail": detail}).encode()
+    return status_code, [(b"content-type", b"application/json"), *headers], body
+
+
+class IdempotencyMiddleware:
+    """Replays the stored response for a repeated Idempotency-Key on
+    endpoints marked with @idempotent, without running them again.
+
+    The first request claims the key with a pending marker (SET NX);
+    duplicates arriving while it runs wait for its result. Only
+    successful responses are kept, for IDEMPOTENCY_TTL_SECONDS; after an
+    error the key is released so the client can retry.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        key = dict(scope["headers"]).get(IDEMPOTENCY_HEADER)
+        if key is None or not self._is_idempotent(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await self._respond(send, *_json_response(400, "Invalid Idempotency-Key header"))
+            return
+
+        user_id = await self._caller(scope)
+        if user_id is None:
+            # Unauthenticated; let the endpoint reject it
+            await self.app(scope, receive, send)
+            return
+
+        body = await self._read_body(receive)
+        redis_key = IDEMPOTENCY_KEY.format(
+            user_id=user_id,
+            method=scope["method"],
+            path=scope["path"],
+            key=key.decode("latin-1"),
+        )
+        fingerprint = _fingerprint(scope, body)
+        pending = json.dumps({"pending": uuid.uuid4().hex, "fingerprint": fingerprint})
+
+        stored = await self._claim(redis_key, pending, fingerprint)
+        if stored is not None:
+            await self._replay(send, stored, fingerprint)
+            return
+
+        await self._run(scope, receive, send, body, redis_key, pending, fingerprint)
+
+    def _is_idempotent(self, scope) -> bool:
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                # Replays never reach the router; MetricsMiddleware still
+                # labels them with the route template.
+                scope["route"] = route
+                return getattr(getattr(route, "endpoint", None), "idempotent", False)
+        return False
+
+    async def _caller(self, scope):
+        # Same token sources and checks as get_current_user, so a replay
+        # is only served to a caller the endpoint itself would accept
+        headers = dict(scope["headers"])
+        cookie = SimpleCookie(headers.get(b"cookie", b"").decode("latin-1")).get("access_token")
+        token = cookie.value if cookie else None
+        if token is None:
+            scheme, _, credentials = headers.get(b"authorization", b"").decode("latin-1").partition(" ")
+            token = credentials if scheme.lower() == "bearer" and credentials else None
+        if token is None:
+            return None
+
+        try:
+            claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except JWTError:
+            return None
+        if claims.get("sub") is None:
+            return None
+        if settings.AUTH_STATELESS:
+            if await is_token_revoked(claims):
+                return None
+        elif not await self._is_active(claims["sub"]):
+            return None
+        return claims["sub"]
+
+    async def _is_active(self, user_id: str) -> bool:
+        # Primary, so a just-deactivated user is not missed on a lagging replica
+        async with SessionLocal() as db:
+            return bool(await db.scalar(select(User.is_active).where(User.id == int(user_id))))
+
+    async def _read_body(self, receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    async def _claim(self, redis_key: str, pending: str, fingerprint: str):
+        """None once this request owns the key, otherwise the stored
+        result or the marker of a request that is still running."""
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        while True:
+            claimed = await redis_client.set(
+                redis_key,
+                pending,
+                nx=True,
+                ex=settings.IDEMPOTENCY_LOCK_SECONDS,
+            )
+            if claimed:
+                return None
+
+            stored = await redis_client.get(redis_key)
+            if stored is None:
+                # Released by a failed first attempt; try to claim again
+                continue
+            stored = json.loads(stored)
+            if (
+                "pending" not in stored
+                or stored["fingerprint"] != fingerprint
+                or time.monotonic() >= deadline
+            ):
+                return stored
+            await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+    async def _replay(self, send, stored: dict, fingerprint: str):
+        if stored["fingerprint"] != fingerprint:
+            await self._respond(send, *_json_response(
+                422, "Idempotency-Key was already used for a different request",
+            ))
+        elif "pending" in stored:
+            await self._respond(send, *_json_response(
+                409,
+                "A request with this Idempotency-Key is still in progress",
+                [(b"retry-after", b"1")],
+            ))
+        else:
+            headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in stored["headers"]]
+            await self._respond(
+                send,
+                stored["status"],
+                [*headers, (REPLAYED_HEADER, b"true")],
+                stored["body"].encode(),
+            )
+
+    async def _run(self, scope, receive, send, body: bytes, redis_key: str, pending: str, fingerprint: str):
+        status_code = None
+        headers = []
+        chunks = []
+        body_sent = False
+
+        async def receive_body():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # Body already consumed; only the disconnect is left to read
+            return await receive()
+
+        async def capture(message):
+            nonlocal status_code, headers
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = message.get("headers", [])
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        result = ""
+        try:
+            await self.app(scope, receive_body, capture)
+            if status_code is not None and status_code < 400:
+                result = json.dumps({
+                    "fingerprint": fingerprint,
+                    "status": status_code,
+                    "headers": [
+                        (name.decode("latin-1"), value.decode("latin-1"))
+                        for name, value in headers
+                        if name.lower() in STORED_HEADERS
+                    ],
+                    "body": b"".join(chunks).decode(),
+                })
+        finally:
+            try:
+                await _finish(
+                    keys=[redis_key],
+                    args=[pending, result, settings.IDEMPOTENCY_TTL_SECONDS],
+                )
+            except Exception:
+                # The marker expires on its own after IDEMPOTENCY_LOCK_SECONDS
+                logger.exception("Failed to store idempotent response for %s", redis_key)
+
+    async def _respond(self, send, status_code: int, headers, body: bytes):
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [*headers, (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,101 @@
+import json
+
+from fastapi import HTTPException
+from redis.exceptions import WatchError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.order_states import TERMINAL_STATUSES
+from app.infrastructure.event_bus import order_board, order_stream, read_order_events
+from app.infrastructure.redis import redis_client
+from app.models.order import Order
+
+# The live board is a hash of order id -> latest event for every active
+# order of a restaurant, kept current by the event bus publish script.
+# The marker field keeps the hash present (i.e. seeded) while it has no
+# orders, so the script knows to maintain it.
+BOARD_MARKER = "seeded"
+
+SEED_ATTEMPTS = 5
+
+
+async def get_order_board(db: AsyncSession, restaurant_id: int) -> dict:
+    """Active orders of a restaurant and the id of the last event they
+    reflect, which a socket can resume from with ``last_event_id``."""
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.hgetall(order_board(restaurant_id))
+        pipe.xrevrange(order_stream(restaurant_id), count=1)
+        board, last = await pipe.execute()
+
+    if not board:
+        return await seed_order_board(db, restaurant_id)
+
+    board.pop(BOARD_MARKER, None)
+    return {
+        "orders": [json.loads(entry) for entry in board.values()],
+        "last_event_id": last[0][0] if last else None,
+    }
+
+
+async def seed_order_board(db: AsyncSession, restaurant_id: int) -> dict:
+    """Build the board from Postgres plus any events published since.
+
+    The stream position is read before the query, so an order change the
+    query might have missed is in the stream after it and gets applied
+    on top. Only that last step has to be atomic with the write.
+    """
+    stream = order_stream(restaurant_id)
+    board = order_board(restaurant_id)
+
+    for _ in range(SEED_ATTEMPTS):
+        last = await redis_client.xrevrange(stream, count=1)
+        start = last[0][0] if last else None
+
+        result = await db.execute(
+            select(Order.id, Order.status, Order.total_amount).where(
+                Order.restaurant_id == restaurant_id,
+                Order.status.notin_([s.value for s in TERMINAL_STATUSES]),
+            )
+        )
+        entries = {
+            str(order_id): json.dumps({
+                "order_id": order_id,
+                "restaurant_id": restaurant_id,
+                "status": order_status,
+                "total": float(total),
+            })
+            for order_id, order_status, total in result
+        }
+
+        async with redis_client.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(stream)
+                events = await read_order_events(restaurant_id, start)
+                if events is None:
+                    # Trimmed past our position during the query
+                    continue
+
+                last_event_id = start
+                for event_id, text in events:
+                    event = json.loads(text)
+                    last_event_id = event_id
+                    if event.get("order_id") is None:
+                        continue
+                    if event.get("status") in TERMINAL_STATUSES:
+                        entries.pop(str(event["order_id"]), None)
+                    else:
+                        entries[str(event["order_id"])] = text
+
+                pipe.multi()
+                pipe.delete(board)
+                pipe.hset(board, mapping={BOARD_MARKER: "1", **entries})
+                await pipe.execute()
+            except WatchError:
+                continue
+
+        return {
+            "orders": [json.loads(entry) for entry in entries.values()],
+            "last_event_id": last_event_id,
+        }
+
+    raise HTTPException(status_code=503, detail="Order board is busy, try again")
@@ -0,0 +1,141 @@
+from collections import defaultdict
+from typing import Any
+
+from fastapi import status
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.order_states import OrderStatus
+from app.infrastructure.outbox import add_order_events
+from app.models.order import Order
+from app.models.order_item import OrderItem
+from app.schemas.order import BulkOrderResponse, BulkOrderResult, OrderIn
+from app.services.active_orders import release_active_orders
+from app.services.resource_versions import bump_orders_version
+from app.services.restaurant_cache import restaurant_cache
+from app.services.subscription_guard import reserve_order_capacity
+
+MAX_BULK_ORDERS = 500
+
+
+def _order_total(order: OrderIn) -> float:
+    return sum(item.quantity * item.unit_price for item in order.items)
+
+
+async def ingest_orders(db: AsyncSession, payloads: list[Any]) -> BulkOrderResponse:
+    """Validate, limit-check and insert a batch of orders set-wise.
+
+    Every payload gets a result at its index; invalid ones, unknown
+    restaurants and orders over the plan limit are rejected individually
+    while the rest of the batch is committed in one transaction.
+    """
+    results: dict[int, BulkOrderResult] = {}
+    by_restaurant: dict[int, list[tuple[int, OrderIn]]] = defaultdict(list)
+
+    for index, payload in enumerate(payloads):
+        try:
+            order = OrderIn.model_validate(payload)
+        except ValidationError as exc:
+            results[index] = BulkOrderResult(
+                index=index,
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail=exc.errors(include_url=False, include_context=False),
+            )
+            continue
+        by_restaurant[order.restaurant_id].append((index, order))
+
+    # Same plan lookup as single creates; misses load in one query
+    restaurants = await restaurant_cache.get_many(db, by_restaurant)
+
+    # One limit check per restaurant for the whole batch
+    reserved: dict[int, int] = {}
+    accepted: list[tuple[int, OrderIn]] = []
+    for restaurant_id, entries in by_restaurant.items():
+        restaurant = restaurants.get(restaurant_id)
+        if restaurant is None:
+            for index, _ in entries:
+                results[index] = BulkOrderResult(
+                    index=index,
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Restaurant not found",
+                )
+            continue
+
+        granted = await reserve_order_capacity(db, restaurant, len(entries), partial=True)
+        reserved[restaurant_id] = granted
+        accepted.extend(entries[:granted])
+        for index, _ in entries[granted:]:
+            results[index] = BulkOrderResult(
+                index=index,
+                status_code=status.HTTP_402_PAYMENT_REQUIRED,
+                detail="Order limit reached. Upgrade plan.",
+            )
+
+    if accepted:
+        try:
+            order_ids = await _insert_orders(db, [order for _, order in accepted])
+        except Exception:
+            for restaurant_id, count in reserved.items():
+                if count:
+                    await release_active_orders(restaurant_id, count)
+            raise
+
+        await bump_orders_version(*(order.restaurant_id for _, order in accepted))
+        for (index, _), order_id in zip(accepted, order_ids):
+            results[index] = BulkOrderResult(
+                index=index,
+                status_code=status.HTTP_201_CREATED,
+                order_id=order_id,
+            )
+
+    return BulkOrderResponse(
+        created=len(accepted),
+        results=[results[index] for index in sorted(results)],
+    )
+
+
+async def _insert_orders(db: AsyncSession, orders: list[OrderIn]) -> list[int]:
+    totals = [_order_total(order) for order in orders]
+
+    # INSERT ... RETURNING id, in parameter order so ids line up with input
+    order_ids = (
+        await db.scalars(
+            insert(Order).returning(Order.id, sort_by_parameter_order=True),
+            [
+                {
+                    "restaurant_id": order.restaurant_id,
+                    "user_id": order.user_id,
+                    "total_amount": total,
+                }
+                for order, total in zip(orders, totals)
+            ],
+        )
+    ).all()
+
+    item_rows = [
+        {
+            "order_id": order_id,
+            "product_name": item.product_name,
+            "quantity": item.quantity,
+            "unit_price": item.unit_price,
+        }
+        for order, order_id in zip(orders, order_ids)
+        for item in order.items
+    ]
+    if item_rows:
+        await db.execute(insert(OrderItem), item_rows)
+
+    await add_order_events(db, [
+        {
+            "type": "ORDER_CREATED",
+            "order_id": order_id,
+            "restaurant_id": order.restaurant_id,
+            "status": OrderStatus.CREATED.value,
+            "total": float(total),
+        }
+        for order, order_id, total in zip(orders, order_ids, totals)
+    ])
+
+    await db.commit()
+    return list(order_ids)
@@ -1,34 +1,138 @@
-from sqlalchemy.orm import Session
+import logging
+import time
+from collections import Counter
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
+from app.core.metrics import ORDER_TRANSITION_DURATION, ORDER_TRANSITIONS
 from app.models.order import Order
-from app.domain.order_states import OrderStatus
-from app.domain.order_transitions import VALID_TRANSITIONS
-
-from app.infrastructure.event_bus import publish_order_event
+from app.domain.order_states import TERMINAL_STATUSES
+from app.domain.order_transitions import ALLOWED_PREDECESSORS
+from app.schemas.order import BulkTransitionResponse, BulkTransitionResult
 
-def transition_order(*, db, order_id, new_status):
-    order = db.get(Order, order_id)
+from app.infrastructure.outbox import add_order_event, add_order_events
+from app.services.active_orders import release_active_orders
+from app.services.resource_versions import bump_orders_version
 
-    if not order:
-        raise HTTPException(status_code=404)
+logger = logging.getLogger(__name__)
 
-    current = OrderStatus(order.status)
-    allowed = VALID_TRANSITIONS.get(current, set())
+def _from_status(new_status) -> str:
+    # Metrics label; every move the API offers has a single predecessor,
+    # only CANCELLED (from CREATED or PAID) is ambiguous.
+    predecessors = ALLOWED_PREDECESSORS[new_status]
+    return next(iter(predecessors)).value if len(predecessors) == 1 else "ANY"
 
-    if new_status not in allowed:
-        raise HTTPException(status_code=409)
+async def transition_order(*, db: AsyncSession, order_id, new_status):
+    # Compare-and-set: the status check and the write are one statement,
+    # so concurrent actions on the same order cannot both succeed.
+    started = time.perf_counter()
+    predecessors = [s.value for s in ALLOWED_PREDECESSORS[new_status]]
+    order = await db.scalar(
+        update(Order)
+        .where(Order.id == order_id, Order.status.in_(predecessors))
+        .values(status=new_status.value)
+        .returning(Order)
+        .execution_options(synchronize_session=False)
+    )
 
-    order.status = new_status.value
-    db.commit()
-    db.refresh(order)
+    if not order:
+        exists = await db.scalar(select(Order.id).where(Order.id == order_id))
+        raise HTTPException(status_code=409 if exists else 404)
 
-    publish_order_event({
+    add_order_event(db, {
         "type": "ORDER_STATUS_CHANGED",
         "order_id": order.id,
         "restaurant_id": order.restaurant_id,
         "status": order.status,
+        "total": float(order.total_amount),
     })
 
+    await db.commit()
+    committed = time.perf_counter()
+    ORDER_TRANSITIONS.labels(_from_status(new_status), new_status.value).inc()
+    ORDER_TRANSITION_DURATION.labels(new_status.value, "db").observe(committed - started)
+
+    await bump_orders_version(order.restaurant_id)
+    if new_status in TERMINAL_STATUSES:
+        # Already committed; the reconciler repairs a missed release
+        try:
+            await release_active_orders(order.restaurant_id)
+        except Exception:
+            logger.exception("Failed to release active-order slot for restaurant %s", order.restaurant_id)
+        ORDER_TRANSITION_DURATION.labels(new_status.value, "redis").observe(
+            time.perf_counter() - committed
+        )
+
     return order
 
+async def transition_orders(*, db: AsyncSession, order_ids, new_status) -> BulkTransitionResponse:
+    """Move many orders to ``new_status`` with one conditional UPDATE.
+
+    Orders not in an allowed predecessor status are left untouched and
+    reported as 409 (or 404 if they do not exist).
+    """
+    started = time.perf_counter()
+    order_ids = list(dict.fromkeys(order_ids))
+    predecessors = [s.value for s in ALLOWED_PREDECESSORS[new_status]]
+
+    result = await db.execute(
+        update(Order)
+        .where(Order.id.in_(order_ids), Order.status.in_(predecessors))
+        .values(status=new_status.value)
+        .returning(Order.id, Order.restaurant_id, Order.total_amount)
+        .execution_options(synchronize_session=False)
+    )
+    updated = {order_id: (restaurant_id, total) for order_id, restaurant_id, total in result}
+
+    if updated:
+        await add_order_events(db, [
+            {
+                "type": "ORDER_STATUS_CHANGED",
+                "order_id": order_id,
+                "restaurant_id": restaurant_id,
+                "status": new_status.value,
+                "total": float(total),
+            }
+            for order_id, (restaurant_id, total) in updated.items()
+        ])
+
+    # Only failures need a second look to tell "missing" from "wrong state"
+    rejected = [order_id for order_id in order_ids if order_id not in updated]
+    existing = set()
+    if rejected:
+        existing = set(await db.scalars(select(Order.id).where(Order.id.in_(rejected))))
+
+    await db.commit()
+    committed = time.perf_counter()
+    if updated:
+        ORDER_TRANSITIONS.labels(_from_status(new_status), new_status.value).inc(len(updated))
+    ORDER_TRANSITION_DURATION.labels(new_status.value, "db").observe(committed - started)
+
+    await bump_orders_version(*(restaurant_id for restaurant_id, _ in updated.values()))
+    if new_status in TERMINAL_STATUSES:
+        for restaurant_id, count in Counter(restaurant_id for restaurant_id, _ in updated.values()).items():
+            try:
+                await release_active_orders(restaurant_id, count)
+            except Exception:
+                logger.exception("Failed to release active-order slots for restaurant %s", restaurant_id)
+        ORDER_TRANSITION_DURATION.labels(new_status.value, "redis").observe(
+            time.perf_counter() - committed
+        )
+
+    results = []
+    for order_id in order_ids:
+        if order_id in updated:
+            results.append(BulkTransitionResult(
+                order_id=order_id,
+                status_code=status.HTTP_200_OK,
+                status=new_status.value,
+            ))
+        else:
+            results.append(BulkTransitionResult(
+                order_id=order_id,
+                status_code=status.HTTP_409_CONFLICT if order_id in existing else status.HTTP_404_NOT_FOUND,
+            ))
+
+    return BulkTransitionResponse(updated=len(updated), results=results)
@@ -0,0 +1,89 @@
+import hashlib
+import logging
+import time
+import uuid
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+from app.db.replicas import replica_router
+from app.infrastructure.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Version counters behind the ETags of list endpoints, bumped after every
+# committed write that changes what they return. Each hash has an "epoch"
+# set when it is (re)created, so counters lost in a Redis flush restart
+# under a new one instead of reissuing ETags clients already hold.
+RESTAURANTS_VERSION_KEY = "restaurants:version"
+ORDERS_VERSION_KEY = "restaurants:{restaurant_id}:orders:version"
+
+
+def orders_version_key(restaurant_id: int) -> str:
+    return ORDERS_VERSION_KEY.format(restaurant_id=restaurant_id)
+
+
+async def bump_versions(*keys: str):
+    """Best effort: callers have already committed, and failing them
+    now would make clients retry a write that succeeded. A missed bump
+    leaves the old ETag valid until the next write."""
+    if not keys:
+        return
+    try:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            for key in dict.fromkeys(keys):
+                pipe.hsetnx(key, "epoch", uuid.uuid4().hex[:8])
+                pipe.hincrby(key, "n", 1)
+                pipe.hset(key, "at", time.time())
+            await pipe.execute()
+    except Exception:
+        logger.exception("Failed to bump versions %s", ", ".join(keys))
+
+
+async def bump_orders_version(*restaurant_ids: int):
+    await bump_versions(*(orders_version_key(restaurant_id) for restaurant_id in restaurant_ids))
+
+
+async def _etag(key: str, request: Request) -> str | None:
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.hsetnx(key, "epoch", uuid.uuid4().hex[:8])
+        pipe.hmget(key, "epoch", "n", "at")
+        _, (epoch, version, bumped_at) = await pipe.execute()
+
+    # A replica may not have the latest write yet; tagging its answer
+    # with the new version would pin clients to stale data.
+    if (
+        replica_router.replicas
+        and bumped_at is not None
+        and time.time() - float(bumped_at) < settings.REPLICA_MAX_LAG_SECONDS
+    ):
+        return None
+
+    # Filters and cursor are part of the resource
+    query = hashlib.sha1(request.url.query.encode()).hexdigest()[:8]
+    return f'W/"{epoch}.{version or 0}.{query}"'
+
+
+def _matches(etag: str, if_none_match: str | None) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 prescribes for If-None-Match
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+async def not_modified(key: str, request: Request, response: Response) -> Response | None:
+    """A 304 when the client already has the current version of the
+    resource versioned by ``key``; otherwise tags ``response`` and
+    returns None so the endpoint builds the body."""
+    etag = await _etag(key, request)
+    if etag is None:
+        return None
+
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _matches(etag, request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,192 @@
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.infrastructure.redis import redis_client
+from app.models.restaurant import Restaurant
+
+logger = logging.getLogger(__name__)
+
+# Every worker's OrderEventSubscriber listens here and evicts the
+# restaurant (and its owner's lookup) from its cache.
+RESTAURANT_INVALIDATION_CHANNEL = "restaurants:invalidate"
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class CachedRestaurant:
+    """The fields of a restaurant that plan checks and login need."""
+
+    id: int
+    name: str
+    owner_id: int
+    plan: str
+
+    @classmethod
+    def from_model(cls, restaurant: Restaurant) -> "CachedRestaurant":
+        return cls(
+            id=restaurant.id,
+            name=restaurant.name,
+            owner_id=restaurant.owner_id,
+            plan=restaurant.plan,
+        )
+
+
+class _TTLCache:
+    """LRU with a per-entry deadline; values may be None."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        value, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class RestaurantCache:
+    """Per-worker cache of restaurants by id and by owner.
+
+    Only used while ``enabled``, i.e. while this worker's subscriber is
+    connected to RESTAURANT_INVALIDATION_CHANNEL; otherwise reads go to
+    Postgres, since invalidations could be missed. The TTL bounds how
+    long an update made without ``invalidate_restaurant`` stays unseen.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.by_id = _TTLCache(maxsize, ttl)
+        self.by_owner = _TTLCache(maxsize, ttl)
+        self.enabled = False
+        # Bumped by every eviction; a load that raced one is not stored,
+        # as it may have read the row before the change.
+        self._generation = 0
+
+    async def get(self, db: AsyncSession, restaurant_id: int) -> Optional[CachedRestaurant]:
+        if self.enabled:
+            cached = self.by_id.get(restaurant_id)
+            if cached is not _MISSING:
+                return cached
+
+        generation = self._generation
+        restaurant = await db.get(Restaurant, restaurant_id)
+        if restaurant is None:
+            return None
+        cached = CachedRestaurant.from_model(restaurant)
+        if self.enabled and generation == self._generation:
+            self.by_id.set(restaurant_id, cached)
+        return cached
+
+    async def get_many(self, db: AsyncSession, restaurant_ids) -> dict[int, CachedRestaurant]:
+        """The restaurants that exist among ``restaurant_ids``, loading
+        all misses in one query."""
+        found = {}
+        missing = []
+        for restaurant_id in restaurant_ids:
+            cached = self.by_id.get(restaurant_id) if self.enabled else _MISSING
+            if cached is _MISSING:
+                missing.append(restaurant_id)
+            else:
+                found[restaurant_id] = cached
+        if not missing:
+            return found
+
+        generation = self._generation
+        loaded = [
+            CachedRestaurant.from_model(restaurant)
+            for restaurant in await db.scalars(select(Restaurant).where(Restaurant.id.in_(missing)))
+        ]
+        store = self.enabled and generation == self._generation
+        for cached in loaded:
+            found[cached.id] = cached
+            if store:
+                self.by_id.set(cached.id, cached)
+        return found
+
+    async def get_owned(self, db: AsyncSession, owner_id: int) -> Optional[CachedRestaurant]:
+        """The restaurant ``owner_id`` owns, or None; both are cached."""
+        if self.enabled:
+            cached = self.by_owner.get(owner_id)
+            if cached is not _MISSING:
+                return cached
+
+        generation = self._generation
+        restaurant = await db.scalar(
+            select(Restaurant)
+            .where(Restaurant.owner_id == owner_id)
+            .limit(1)
+        )
+        cached = CachedRestaurant.from_model(restaurant) if restaurant else None
+        if self.enabled and generation == self._generation:
+            self.by_owner.set(owner_id, cached)
+            if cached is not None:
+                self.by_id.set(cached.id, cached)
+        return cached
+
+    def evict(self, restaurant_id: Optional[int] = None, owner_id: Optional[int] = None):
+        self._generation += 1
+        if restaurant_id is not None:
+            self.by_id.pop(restaurant_id)
+        if owner_id is not None:
+            self.by_owner.pop(owner_id)
+
+    def handle_invalidation(self, data: str):
+        message = json.loads(data)
+        self.evict(message.get("restaurant_id"), message.get("owner_id"))
+
+    def enable(self):
+        # Anything cached before the subscription may already be stale
+        self.clear()
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        self.clear()
+
+    def clear(self):
+        self._generation += 1
+        self.by_id.clear()
+        self.by_owner.clear()
+
+
+restaurant_cache = RestaurantCache(
+    maxsize=settings.RESTAURANT_CACHE_SIZE,
+    ttl=settings.RESTAURANT_CACHE_TTL_SECONDS,
+)
+
+
+async def invalidate_restaurant(restaurant_id: int, owner_id: Optional[int] = None):
+    """Evict a restaurant from every worker's cache. Call after committing
+    any change to it, including creating one for ``owner_id``."""
+    restaurant_cache.evict(restaurant_id, owner_id)
+    await redis_client.publish(
+        RESTAURANT_INVALIDATION_CHANNEL,
+        json.dumps({"restaurant_id": restaurant_id, "owner_id": owner_id}),
+    )
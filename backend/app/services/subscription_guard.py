@@ -1,33 +1,38 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
-from app.models.order import Order
-from app.models.restaurant import Restaurant
 from app.domain.subscription_plans import Plan, PLAN_LIMITS
+from app.services.active_orders import reserve_active_orders
+from app.services.restaurant_cache import CachedRestaurant, restaurant_cache
 
-def enforce_order_limit(db: Session, restaurant_id: int):
-    restaurant = db.get(Restaurant, restaurant_id)
+async def enforce_order_limit(db: AsyncSession, restaurant_id: int, count: int = 1):
+    """Reserve ``count`` active-order slots or raise 402.
+
+    Callers must release the slots with ``release_active_orders`` if the
+    orders are not committed.
+    """
+    restaurant = await restaurant_cache.get(db, restaurant_id)
 
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
 
-    plan = Plan(restaurant.plan)
-    limit = PLAN_LIMITS[plan]["max_active_orders"]
-
-    if limit is None:
-        return
-
-    active_orders = (
-        db.query(Order)
-        .filter(
-            Order.restaurant_id == restaurant_id,
-            Order.status.notin_(["COMPLETED", "CANCELLED"]),
-        )
-        .count()
-    )
-
-    if active_orders >= limit:
+    if await reserve_order_capacity(db, restaurant, count) < count:
         raise HTTPException(
             status_code=status.HTTP_402_PAYMENT_REQUIRED,
             detail="Order limit reached. Upgrade plan.",
         )
+
+async def reserve_order_capacity(
+    db: AsyncSession,
+    restaurant: CachedRestaurant,
+    count: int,
+    partial: bool = False,
+) -> int:
+    """Reserve active-order slots under the restaurant's plan limit and
+    return how many were granted. With ``partial`` as many as still fit
+    are granted (bulk ingestion), otherwise all or none."""
+    plan = Plan(restaurant.plan)
+    limit = PLAN_LIMITS[plan]["max_active_orders"]
+
+    # Unlimited plans still reserve so the counter stays correct on downgrade
+    return await reserve_active_orders(db, restaurant.id, limit, count, partial)
@@ -0,0 +1,49 @@
+import time
+
+from app.core.config import settings
+from app.infrastructure.redis import redis_client
+
+# Revocation state for stateless auth (AUTH_STATELESS). Entries only need
+# to outlive the tokens they cancel, so they expire with them.
+REVOKED_TOKEN_KEY = "auth:revoked:token:{jti}"
+REVOKED_USER_KEY = "auth:revoked:user:{user_id}"
+
+
+def _token_lifetime_seconds() -> int:
+    return settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+
+async def revoke_token(claims: dict):
+    """Reject one token (e.g. on logout) until it would have expired."""
+    jti = claims.get("jti")
+    if not jti:
+        return
+
+    ttl = int(claims.get("exp", 0) - time.time())
+    if ttl > 0:
+        await redis_client.set(REVOKED_TOKEN_KEY.format(jti=jti), 1, ex=ttl)
+
+
+async def revoke_user_tokens(user_id: int):
+    """Reject every token issued to a user so far.
+
+    Call when a user is deactivated, deleted or changes role.
+    """
+    await redis_client.set(
+        REVOKED_USER_KEY.format(user_id=user_id),
+        int(time.time()),
+        ex=_token_lifetime_seconds(),
+    )
+
+
+async def is_token_revoked(claims: dict) -> bool:
+    token_revoked, revoked_before = await redis_client.mget(
+        REVOKED_TOKEN_KEY.format(jti=claims.get("jti")),
+        REVOKED_USER_KEY.format(user_id=claims.get("sub")),
+    )
+    if token_revoked:
+        return True
+
+    # iat is whole seconds, so a token from the revocation second is
+    # treated as revoked too
+    return revoked_before is not None and claims.get("iat", 0) <= int(revoked_before)
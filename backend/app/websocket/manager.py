@@ -1,17 +1,243 @@
-from typing import Dict, List
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from enum import Enum
+from typing import Dict, List, NamedTuple, Optional
+
 from fastapi import WebSocket
 
+from app.core.config import settings
+from app.core.metrics import WS_ACTIVE_CONNECTIONS, WS_DELIVERY_LAG
+
+logger = logging.getLogger(__name__)
+
+# Tells a client it may have missed events and has to refetch the order
+# list as on a fresh connect.
+RESYNC_FRAME = '{"type":"RESYNC_REQUIRED"}'
+
+
+class OverflowPolicy(str, Enum):
+    DROP_OLDEST = "drop_oldest"
+    # Replace a queued event for the same order, else drop the oldest
+    COALESCE = "coalesce"
+    # Close the socket; the client reconnects and refetches
+    DISCONNECT = "disconnect"
+
+
+class QueuedEvent(NamedTuple):
+    # Order id for status changes, which a later change for the order
+    # supersedes; None for events that are never coalesced
+    key: Optional[int]
+    event_id: Optional[str]
+    # Publish time for live events, None for replayed ones
+    published_at: Optional[float]
+    text: str
+
+
+class Connection:
+    """One dashboard socket with a bounded outgoing queue and its own
+    writer task, so a slow client never delays the others.
+
+    With a ``batch_window`` the writer collects events for that long and
+    sends them as one JSON array frame, keeping only the latest status
+    change per order.
+
+    A resuming socket is connected without a writer: live events are
+    buffered until ``replay`` has queued the missed ones in front of them.
+    """
+
+    def __init__(
+        self,
+        restaurant_id: int,
+        websocket: WebSocket,
+        queue_size: int,
+        overflow_policy: OverflowPolicy,
+        on_failure,
+        batch_window: Optional[float] = None,
+    ):
+        self.restaurant_id = restaurant_id
+        self.websocket = websocket
+        self.queue_size = queue_size
+        self.overflow_policy = overflow_policy
+        self.on_failure = on_failure
+        self.batch_window = batch_window
+        self._queue: deque[QueuedEvent] = deque()
+        self._has_messages = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self.closed = False
+
+    def start(self):
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def replay(self, events: list[tuple[str, str]]):
+        """Queue missed (event id, text) events ahead of the buffered live
+        ones, skipping live events the replay already covers, and start
+        writing."""
+        if self.closed:
+            return
+        replayed = {event_id for event_id, _ in events}
+        live = [item for item in self._queue if item.event_id not in replayed]
+        self._queue = deque(
+            [QueuedEvent(None, event_id, None, text) for event_id, text in events] + live
+        )
+        if self._queue:
+            self._has_messages.set()
+        self.start()
+
+    def stop(self):
+        self.closed = True
+        if self._writer is not None:
+            self._writer.cancel()
+            self._writer = None
+
+    def enqueue(self, event: QueuedEvent) -> bool:
+        """Queue an event without waiting on the network. Returns False
+        when the overflow policy says the connection must be dropped."""
+        if self.closed:
+            return False
+
+        if len(self._queue) >= self.queue_size:
+            if self.overflow_policy == OverflowPolicy.DISCONNECT:
+                return False
+            if self.overflow_policy == OverflowPolicy.COALESCE:
+                self._discard(event.key)
+            if len(self._queue) >= self.queue_size:
+                self._queue.popleft()
+
+        self._queue.append(event)
+
+        self._has_messages.set()
+        return True
+
+    def _discard(self, key: Optional[int]):
+        # Older status changes for the order are superseded by the new one
+        if key is not None:
+            self._queue = deque(item for item in self._queue if item.key != key)
+
+    def _take_batch(self) -> list[QueuedEvent]:
+        items = list(self._queue)
+        self._queue.clear()
+        latest = {item.key: index for index, item in enumerate(items) if item.key is not None}
+        return [
+            item
+            for index, item in enumerate(items)
+            if item.key is None or latest[item.key] == index
+        ]
+
+    @staticmethod
+    def _observe_lag(events):
+        now = time.time()
+        for event in events:
+            if event.published_at is not None:
+                WS_DELIVERY_LAG.observe(now - event.published_at)
+
+    async def _write_loop(self):
+        try:
+            while True:
+                await self._has_messages.wait()
+
+                if self.batch_window:
+                    await asyncio.sleep(self.batch_window)
+                    self._has_messages.clear()
+                    batch = self._take_batch()
+                    if batch:
+                        await self.websocket.send_text(
+                            "[" + ",".join(event.text for event in batch) + "]"
+                        )
+                        self._observe_lag(batch)
+                    continue
+
+                while self._queue:
+                    event = self._queue.popleft()
+                    await self.websocket.send_text(event.text)
+                    self._observe_lag((event,))
+                self._has_messages.clear()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.info("Dropping dead socket for restaurant %s", self.restaurant_id)
+            self.on_failure(self)
+
+
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[int, List[WebSocket]] = {}
+    def __init__(
+        self,
+        queue_size: int = settings.WS_SEND_QUEUE_SIZE,
+        overflow_policy: OverflowPolicy = OverflowPolicy(settings.WS_OVERFLOW_POLICY),
+    ):
+        self.queue_size = queue_size
+        self.overflow_policy = overflow_policy
+        self.active_connections: Dict[int, List[Connection]] = {}
 
-    async def connect(self, restaurant_id: int, websocket: WebSocket):
+    async def connect(
+        self,
+        restaurant_id: int,
+        websocket: WebSocket,
+        batch_window: Optional[float] = None,
+        resuming: bool = False,
+    ) -> Connection:
         await websocket.accept()
-        self.active_connections.setdefault(restaurant_id, []).append(websocket)
+        connection = Connection(
+            restaurant_id,
+            websocket,
+            self.queue_size,
+            self.overflow_policy,
+            self._drop,
+            batch_window,
+        )
+        # A resuming connection starts writing from Connection.replay
+        if not resuming:
+            connection.start()
+        self.active_connections.setdefault(restaurant_id, []).append(connection)
+        WS_ACTIVE_CONNECTIONS.inc()
+        return connection
+
+    def disconnect(self, restaurant_id: int, connection: Connection):
+        connection.stop()
+        connections = self.active_connections.get(restaurant_id, [])
+        if connection in connections:
+            connections.remove(connection)
+            WS_ACTIVE_CONNECTIONS.dec()
+        if not connections:
+            self.active_connections.pop(restaurant_id, None)
+
+    def broadcast(self, restaurant_id: int, message: dict, text: Optional[str] = None):
+        """Hand an event to every local socket of the restaurant.
+
+        Only enqueues, so it never waits on a client; ``text`` is the
+        already-serialized message when the caller has it.
+        """
+        connections = self.active_connections.get(restaurant_id)
+        if not connections:
+            return
+
+        if text is None:
+            text = json.dumps(message)
+        event = QueuedEvent(
+            key=message.get("order_id") if message.get("type") == "ORDER_STATUS_CHANGED" else None,
+            event_id=message.get("event_id"),
+            published_at=message.get("published_at"),
+            text=text,
+        )
+
+        for connection in list(connections):
+            if not connection.enqueue(event):
+                self._drop(connection)
+
+    def _drop(self, connection: Connection):
+        # Unregister right away so no more events are queued, then close;
+        # the endpoint sees the disconnect and finishes its own cleanup.
+        self.disconnect(connection.restaurant_id, connection)
+        asyncio.create_task(self._close(connection.websocket))
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            await websocket.close(code=1013)  # Try again later
+        except Exception:
+            pass
 
-    def disconnect(self, restaurant_id: int, websocket: WebSocket):
-        self.active_connections[restaurant_id].remove(websocket)
 
-    async def broadcast(self, restaurant_id: int, message: dict):
-        for ws in self.active_connections.get(restaurant_id, []):
-            await ws.send_json(message)
+# One manager per worker process, shared by the endpoint and the subscriber
+manager = ConnectionManager()
@@ -0,0 +1,174 @@
+import asyncio
+import json
+import logging
+
+from app.infrastructure.event_bus import order_channel
+from app.infrastructure.redis import redis_client
+from app.services.restaurant_cache import RESTAURANT_INVALIDATION_CHANNEL, restaurant_cache
+from app.websocket.manager import RESYNC_FRAME, ConnectionManager, manager
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_DELAY_SECONDS = 1.0
+# How long sync() waits for Redis to confirm a new subscription
+SUBSCRIBE_TIMEOUT_SECONDS = 5.0
+
+
+class OrderEventSubscriber:
+    """Single Redis subscription per worker, fanned out to local sockets.
+
+    The worker is subscribed to exactly the per-restaurant channels that
+    have at least one socket open in this process, plus the restaurant
+    cache invalidations; the cache is only used while those are confirmed.
+
+    A channel only delivers once Redis has confirmed the SUBSCRIBE.
+    Sockets on a channel that was (re)subscribed without anyone waiting
+    for that, e.g. after a reconnect, get RESYNC_REQUIRED on confirmation
+    since they may have missed events.
+    """
+
+    def __init__(self, manager: ConnectionManager):
+        self.manager = manager
+        self._pubsub = None
+        self._task: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+        self._confirmed: set[str] = set()
+        self._waiters: dict[str, asyncio.Future] = {}
+        self._resync: set[str] = set()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def sync(self, restaurant_id: int) -> bool:
+        """Subscribe to or unsubscribe from a restaurant's channel so that
+        it matches whether this worker still has sockets for it.
+
+        Returns True once the channel is live, i.e. every event published
+        from now on reaches the restaurant's sockets. When it is not (not
+        connected, or no confirmation in time) the sockets are sent
+        RESYNC_REQUIRED as soon as it is.
+        """
+        channel = order_channel(restaurant_id)
+        async with self._lock:
+            wanted = restaurant_id in self.manager.active_connections
+            if self._pubsub is None:
+                # Not connected yet; _listen subscribes to everything
+                # in the manager once it is.
+                return False
+
+            subscribed = (
+                channel in self._pubsub.channels
+                and channel not in self._pubsub.pending_unsubscribe_channels
+            )
+            try:
+                if wanted and not subscribed:
+                    self._confirmed.discard(channel)
+                    await self._pubsub.subscribe(channel)
+                elif subscribed and not wanted:
+                    await self._pubsub.unsubscribe(channel)
+                    self._confirmed.discard(channel)
+            except Exception:
+                # The listener reconnects and resubscribes to everything
+                # the manager holds, so the socket can stay open.
+                logger.exception("Failed to update subscription for restaurant %s", restaurant_id)
+                return False
+
+            if not wanted:
+                return False
+            if channel in self._confirmed:
+                return True
+            waiter = self._waiters.get(channel)
+            if waiter is None:
+                waiter = self._waiters[channel] = asyncio.get_running_loop().create_future()
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(waiter), SUBSCRIBE_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            self._resync.add(channel)
+            return False
+
+    async def _run(self):
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Order event subscriber failed, reconnecting")
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+    async def _listen(self):
+        # Subscribe confirmations are needed to know when a channel is live
+        pubsub = redis_client.pubsub()
+        try:
+            async with self._lock:
+                channels = [order_channel(r) for r in self.manager.active_connections]
+                # Sockets open across a reconnect may have missed events
+                self._resync.update(channels)
+                await pubsub.subscribe(RESTAURANT_INVALIDATION_CHANNEL, *channels)
+                self._pubsub = pubsub
+
+            while True:
+                message = await pubsub.get_message(timeout=None)
+                if message:
+                    await self._dispatch(message)
+                    # Let socket writers drain between events of a burst
+                    await asyncio.sleep(0)
+        finally:
+            restaurant_cache.disable()
+            async with self._lock:
+                self._pubsub = None
+                self._confirmed.clear()
+                for waiter in self._waiters.values():
+                    if not waiter.done():
+                        waiter.set_result(False)
+                self._waiters.clear()
+            await pubsub.aclose()
+
+    def _confirm(self, channel: str):
+        self._confirmed.add(channel)
+        if channel == RESTAURANT_INVALIDATION_CHANNEL:
+            restaurant_cache.enable()
+            return
+
+        waiter = self._waiters.pop(channel, None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(True)
+        if channel in self._resync:
+            self._resync.discard(channel)
+            restaurant_id = int(channel.rsplit(":", 1)[1])
+            self.manager.broadcast(restaurant_id, {"type": "RESYNC_REQUIRED"}, RESYNC_FRAME)
+
+    async def _dispatch(self, message: dict):
+        if message.get("type") == "subscribe":
+            self._confirm(message["channel"])
+            return
+        if message.get("type") == "unsubscribe":
+            self._confirmed.discard(message["channel"])
+            return
+        if message.get("type") != "message":
+            return
+
+        if message["channel"] == RESTAURANT_INVALIDATION_CHANNEL:
+            restaurant_cache.handle_invalidation(message["data"])
+            return
+
+        data = json.loads(message["data"])
+        restaurant_id = data.get("restaurant_id")
+
+        # Non-blocking: each socket's writer task does the actual send
+        self.manager.broadcast(restaurant_id, data, message["data"])
+
+
+order_event_subscriber = OrderEventSubscriber(manager)
@@ -0,0 +1,36 @@
+"""Periodically rebuild the Redis active-order counters from Postgres.
+
+Run with ``python -m app.workers.active_orders_reconciler``. The counters
+are maintained incrementally by create_order and transition_order; this
+job corrects drift left behind by crashes between the Redis update and
+the database commit.
+"""
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.active_orders import reconcile_active_orders
+
+logger = logging.getLogger(__name__)
+
+
+async def run():
+    while True:
+        try:
+            async with SessionLocal() as db:
+                corrected = await reconcile_active_orders(db)
+            logger.info("Corrected %d active-order counters", corrected)
+        except Exception:
+            logger.exception("Active-order reconcile failed")
+
+        await asyncio.sleep(settings.ACTIVE_ORDERS_RECONCILE_INTERVAL_SECONDS)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Drain the order_events outbox into Redis.
+
+Run with ``python -m app.workers.outbox_relay``. Each batch is claimed
+with ``FOR UPDATE SKIP LOCKED``, published in one pipeline and deleted in
+the same transaction, so an event is only removed once Redis has
+accepted it and survives relay or Redis restarts (at-least-once).
+Running a single relay keeps per-restaurant event order; extra relays
+add throughput at the cost of that ordering.
+"""
+import asyncio
+import logging
+
+from prometheus_client import start_http_server
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.infrastructure.event_bus import event_bus
+from app.infrastructure.outbox import claim_order_events, delete_order_events
+
+logger = logging.getLogger(__name__)
+
+
+async def relay_batch(batch_size: int) -> int:
+    async with SessionLocal() as db:
+        events = await claim_order_events(db, batch_size)
+        if not events:
+            return 0
+
+        await event_bus.publish_many([event.payload for event in events])
+
+        await delete_order_events(db, [event.id for event in events])
+        await db.commit()
+        return len(events)
+
+
+async def run():
+    batch_size = settings.OUTBOX_BATCH_SIZE
+    while True:
+        try:
+            relayed = await relay_batch(batch_size)
+        except Exception:
+            logger.exception("Outbox relay batch failed")
+            relayed = 0
+
+        # Keep draining while there is a backlog, otherwise poll
+        if relayed < batch_size:
+            await asyncio.sleep(settings.OUTBOX_POLL_INTERVAL_SECONDS)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    if settings.OUTBOX_RELAY_METRICS_PORT:
+        start_http_server(settings.OUTBOX_RELAY_METRICS_PORT)
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
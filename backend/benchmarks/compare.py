@@ -0,0 +1,57 @@
+"""Diff two benchmark result files from benchmarks.lifecycle.
+
+    python -m benchmarks.compare benchmarks/results/before.json benchmarks/results/after.json
+"""
+import argparse
+import json
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def rows(results: dict):
+    for scenario, metrics in results.items():
+        for name, summary in metrics.items():
+            if isinstance(summary, dict):
+                yield f"{scenario}.{name}", summary
+
+
+def change(before, after) -> str:
+    if not before or after is None:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark runs")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+
+    before, after = load(args.before), load(args.after)
+    for label, report in (("before", before), ("after", after)):
+        meta = report["meta"]
+        print(f"{label}: {meta['git_revision']} {meta['timestamp']} ({meta['database']}, {meta['redis']})")
+    print()
+
+    old = dict(rows(before["results"]))
+    header = f"{'metric':<28}{'per_second':>26}{'p95 ms':>28}{'errors':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, new in rows(after["results"]):
+        previous = old.get(name, {})
+        old_rate, new_rate = previous.get("per_second"), new.get("per_second")
+        old_p95 = previous.get("latency_ms", {}).get("p95")
+        new_p95 = new.get("latency_ms", {}).get("p95")
+        print(
+            f"{name:<28}"
+            f"{f'{old_rate} -> {new_rate}':>18}{change(old_rate, new_rate):>8}"
+            f"{f'{old_p95} -> {new_p95}':>20}{change(old_p95, new_p95):>8}"
+            f"{sum(new.get('errors', {}).values()):>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""Runs the real app in-process against local stand-ins for the
+benchmarks: SQLite (or a throwaway Postgres) and fakeredis (or a local
+redis-server), served by uvicorn on a loopback port in a background
+thread together with the outbox relay.
+
+``configure`` must run before anything under ``app`` is imported, since
+settings are read at import time.
+"""
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+
+
+def configure(database_url: str | None, redis_url: str | None, bcrypt_rounds: int) -> dict:
+    """Point the app's settings at the stand-ins and return a description
+    of them for the results file."""
+    if database_url is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="kitchen-bench-"), "bench.db")
+        database_url = f"sqlite:///{path}"
+
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["BCRYPT_ROUNDS"] = str(bcrypt_rounds)
+    # One server process: give it the whole connection budget
+    os.environ["WEB_CONCURRENCY"] = "1"
+    if redis_url is not None:
+        os.environ["REDIS_URL"] = redis_url
+
+    return {
+        "database": database_url.split(":", 1)[0],
+        "redis": "redis-server" if redis_url else "fakeredis",
+        "bcrypt_rounds": bcrypt_rounds,
+    }
+
+
+def reset_database():
+    # Only ever run against a throwaway database
+    from sqlalchemy import create_engine
+
+    import app.models  # noqa: F401  registers every table
+    from app.core.config import settings
+    from app.db.base_class import Base
+
+    engine = create_engine(settings.DATABASE_URL)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+
+def use_fakeredis():
+    import fakeredis
+    from fakeredis import aioredis
+
+    from app.infrastructure.redis import redis_pool
+
+    # Every module shares this pool, so swapping its connection class
+    # is enough to move the whole app onto fakeredis.
+    redis_pool.connection_class = aioredis.FakeConnection
+    redis_pool.connection_kwargs["server"] = fakeredis.FakeServer()
+
+
+def run_sql(statement: str, **params):
+    from sqlalchemy import create_engine, text
+
+    from app.core.config import settings
+
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.begin() as conn:
+        conn.execute(text(statement), params)
+    engine.dispose()
+
+
+class Server:
+    """uvicorn serving app.main on a free loopback port, with the outbox
+    relay running on the same event loop."""
+
+    def __init__(self):
+        import uvicorn
+
+        from app.main import app
+        from app.workers.outbox_relay import run as run_relay
+
+        lifespan = app.router.lifespan_context
+
+        @asynccontextmanager
+        async def with_relay(app):
+            async with lifespan(app):
+                relay = asyncio.create_task(run_relay())
+                yield
+                relay.cancel()
+
+        app.router.lifespan_context = with_relay
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+
+        self._server = uvicorn.Server(uvicorn.Config(
+            app,
+            host="127.0.0.1",
+            port=self.port,
+            log_level="warning",
+            ws="websockets",
+        ))
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}"
+
+    def __enter__(self):
+        self._thread.start()
+        deadline = time.monotonic() + 30
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("Benchmark server did not start")
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc):
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
+
+
+def client(server: Server) -> httpx.AsyncClient:
+    # One client per identity: the access token lives in its cookie jar
+    return httpx.AsyncClient(base_url=server.base_url, timeout=60)
+
+
+class Recorder:
+    """Latencies and failures of one scenario."""
+
+    def __init__(self):
+        self.latencies: list[float] = []
+        self.errors: dict[str, int] = {}
+        self.started = time.perf_counter()
+        self.finished: float | None = None
+
+    def ok(self, seconds: float):
+        self.latencies.append(seconds)
+
+    def error(self, reason: str):
+        self.errors[reason] = self.errors.get(reason, 0) + 1
+
+    def stop(self):
+        self.finished = time.perf_counter()
+
+    def summary(self, unit: str, completed: int | None = None) -> dict:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        completed = len(self.latencies) if completed is None else completed
+        return {
+            "unit": unit,
+            "completed": completed,
+            "errors": self.errors,
+            "seconds": round(elapsed, 3),
+            "per_second": round(completed / elapsed, 2) if elapsed else None,
+            "latency_ms": percentiles(self.latencies),
+        }
+
+
+def percentiles(samples: list[float]) -> dict:
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def at(fraction):
+        return round(ordered[min(int(fraction * len(ordered)), len(ordered) - 1)] * 1000, 3)
+
+    return {
+        "p50": at(0.50),
+        "p95": at(0.95),
+        "p99": at(0.99),
+        "max": round(ordered[-1] * 1000, 3),
+        "mean": round(sum(ordered) / len(ordered) * 1000, 3),
+    }
+
+
+async def timed(recorder: Recorder, request, expected: int = 200):
+    """Await an httpx request coroutine and record its latency, or its
+    status code as the failure reason."""
+    start = time.perf_counter()
+    try:
+        response = await request
+    except httpx.HTTPError as exc:
+        recorder.error(type(exc).__name__)
+        return None
+    if response.status_code != expected:
+        recorder.error(str(response.status_code))
+        return None
+    recorder.ok(time.perf_counter() - start)
+    return response
@@ -0,0 +1,215 @@
+"""Compare query plans for the order hot paths before and after the
+9c41d2e7a0b3 index migration.
+
+Builds a scratch schema with synthetic orders, runs EXPLAIN ANALYZE on
+each hot query with the old index set, switches to the new one and runs
+them again. Nothing outside the scratch schema is touched.
+
+    docker compose exec backend python -m benchmarks.index_plans
+    python -m benchmarks.index_plans --orders 2000000 --json plans.json
+
+Needs Postgres: DATABASE_URL (or --url) must point at it.
+"""
+import argparse
+import json
+
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+
+SCHEMA = "bench_index_plans"
+
+ACTIVE = "status NOT IN ('COMPLETED', 'CANCELLED')"
+
+TABLES = """
+CREATE TABLE orders (
+    id bigserial PRIMARY KEY,
+    restaurant_id integer NOT NULL,
+    user_id integer NOT NULL,
+    status varchar(50) NOT NULL,
+    total_amount numeric(10, 2) NOT NULL,
+    payment_status varchar(20) NOT NULL,
+    created_at timestamptz NOT NULL DEFAULT now()
+);
+CREATE TABLE order_items (
+    id bigserial PRIMARY KEY,
+    order_id bigint NOT NULL REFERENCES orders (id) ON DELETE CASCADE,
+    product_name varchar(255) NOT NULL,
+    quantity integer NOT NULL,
+    unit_price numeric(10, 2) NOT NULL
+);
+CREATE INDEX ix_orders_restaurant_id_id ON orders (restaurant_id, id);
+CREATE INDEX ix_orders_restaurant_id_status_id ON orders (restaurant_id, status, id);
+CREATE INDEX ix_orders_restaurant_id_payment_status_id ON orders (restaurant_id, payment_status, id);
+CREATE INDEX ix_orders_restaurant_id_created_at ON orders (restaurant_id, created_at);
+CREATE INDEX ix_orders_user_id ON orders (user_id);
+"""
+
+BEFORE = """
+CREATE INDEX ix_orders_status ON orders (status);
+CREATE INDEX ix_orders_payment_status ON orders (payment_status);
+"""
+
+AFTER = f"""
+DROP INDEX ix_orders_status;
+DROP INDEX ix_orders_payment_status;
+CREATE INDEX ix_orders_restaurant_id_status_active ON orders (restaurant_id, status) WHERE {ACTIVE};
+CREATE INDEX ix_order_items_order_id ON order_items (order_id);
+"""
+
+# Most orders in a long-lived tenant are finished; the mix decides how
+# much a partial index saves.
+SEED = """
+INSERT INTO orders (restaurant_id, user_id, status, total_amount, payment_status, created_at)
+SELECT
+    1 + (n % :restaurants),
+    1 + (n % 5000),
+    CASE
+        WHEN n % 100 < :active_percent THEN (ARRAY['CREATED', 'PAID', 'ACCEPTED', 'PREPARING', 'READY'])[1 + n % 5]
+        WHEN n % 10 = 0 THEN 'CANCELLED'
+        ELSE 'COMPLETED'
+    END,
+    (n % 200) + 0.5,
+    CASE WHEN n % 100 < :active_percent THEN 'PENDING' ELSE 'CAPTURED' END,
+    now() - make_interval(secs => :orders - n)
+FROM generate_series(1, :orders) AS n;
+
+INSERT INTO order_items (order_id, product_name, quantity, unit_price)
+SELECT o.id, 'item ' || i, 1 + i, 10
+FROM orders o CROSS JOIN generate_series(1, :items_per_order) AS i;
+
+ANALYZE orders;
+ANALYZE order_items;
+"""
+
+QUERIES = {
+    # enforce_order_limit seeding / count_active_orders
+    "count_active_orders": f"""
+        SELECT count(*) FROM orders
+        WHERE restaurant_id = :restaurant_id AND {ACTIVE}
+    """,
+    # order board seed
+    "active_board": f"""
+        SELECT id, status, total_amount FROM orders
+        WHERE restaurant_id = :restaurant_id AND {ACTIVE}
+    """,
+    # active orders reconciler
+    "reconcile_active_orders": f"""
+        SELECT restaurant_id, count(*) FROM orders
+        WHERE {ACTIVE}
+        GROUP BY restaurant_id
+    """,
+    # selectinload(Order.items) for a page of GET /orders
+    "load_items": """
+        SELECT * FROM order_items WHERE order_id IN (
+            SELECT id FROM orders WHERE restaurant_id = :restaurant_id
+            ORDER BY id DESC LIMIT 50
+        )
+    """,
+    # ON DELETE CASCADE has to find the order's items
+    "delete_order": """
+        DELETE FROM orders WHERE id = :order_id
+    """,
+    # Index maintenance on the write path
+    "insert_orders": """
+        INSERT INTO orders (restaurant_id, user_id, status, total_amount, payment_status)
+        SELECT :restaurant_id, n, 'CREATED', 10, 'PENDING'
+        FROM generate_series(1, 10000) AS n
+    """,
+}
+
+
+def explain(conn, sql: str, params: dict) -> dict:
+    # Run in a savepoint so writes are measured but never kept
+    with conn.begin_nested() as savepoint:
+        plan = conn.execute(
+            text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params
+        ).scalar()[0]
+        savepoint.rollback()
+
+    with conn.begin_nested() as savepoint:
+        rendered = "\n".join(conn.execute(
+            text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"), params
+        ).scalars())
+        savepoint.rollback()
+
+    triggers = sum(t["Time"] for t in plan.get("Triggers", []))
+    return {
+        "execution_ms": plan["Execution Time"],
+        "trigger_ms": triggers,
+        "plan": rendered,
+    }
+
+
+def run_queries(conn, params: dict) -> dict:
+    return {name: explain(conn, sql, params) for name, sql in QUERIES.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=settings.DATABASE_URL)
+    parser.add_argument("--orders", type=int, default=500_000)
+    parser.add_argument("--restaurants", type=int, default=200)
+    parser.add_argument("--items-per-order", type=int, default=2)
+    parser.add_argument("--active-percent", type=int, default=5)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch schema")
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    with engine.connect() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        conn.execute(text(f"SET search_path TO {SCHEMA}"))
+        conn.execute(text(TABLES + BEFORE))
+        for statement in SEED.split(";"):
+            if statement.strip():
+                conn.execute(text(statement), {
+                    "orders": args.orders,
+                    "restaurants": args.restaurants,
+                    "items_per_order": args.items_per_order,
+                    "active_percent": args.active_percent,
+                })
+        conn.commit()
+
+        params = {
+            "restaurant_id": 1,
+            "order_id": conn.execute(text("SELECT max(id) / 2 FROM orders")).scalar(),
+        }
+
+        results = {"params": {**vars(args), **params, "url": None}}
+        results["before"] = run_queries(conn, params)
+        conn.execute(text(AFTER))
+        conn.execute(text("ANALYZE orders; ANALYZE order_items"))
+        conn.commit()
+        results["after"] = run_queries(conn, params)
+
+        if not args.keep:
+            conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+            conn.commit()
+
+    for name in QUERIES:
+        before, after = results["before"][name], results["after"][name]
+        print(f"=== {name}")
+        print("--- before")
+        print(before["plan"])
+        print("--- after")
+        print(after["plan"])
+        print()
+
+    print(f"{'query':<26}{'before ms':>12}{'after ms':>12}")
+    for name in QUERIES:
+        before, after = results["before"][name], results["after"][name]
+        print(
+            f"{name:<26}"
+            f"{before['execution_ms'] + before['trigger_ms']:>12.2f}"
+            f"{after['execution_ms'] + after['trigger_ms']:>12.2f}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,32 @@
-import multiprocessing
+import os
+import shutil
+
+from app.core.config import web_concurrency
+
+# Workers write metric samples here and /metrics merges them
+# (see app/core/metrics.py). Inherited by the forked workers.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus_multiproc")
 
 bind = "0.0.0.0:8000"
-workers = multiprocessing.cpu_count() * 2 + 1
+# WEB_CONCURRENCY; the DB pools split DB_CONNECTION_BUDGET by the same count
+workers = web_concurrency()
 worker_class = "uvicorn.workers.UvicornWorker"
 timeout = 30
 keepalive = 5
 loglevel = "info"
 accesslog = "-"
 errorlog = "-"
+
+
+def on_starting(server):
+    # Samples left over from a previous run would be merged into this one
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    # Drops the dead worker's live gauges (open sockets)
+    multiprocess.mark_process_dead(worker.pid)
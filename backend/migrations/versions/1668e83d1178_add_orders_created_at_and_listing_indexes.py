@@ -0,0 +1,48 @@
+"""add orders created_at and listing indexes
+
+Revision ID: 1668e83d1178
+Revises: 320478567581
+Create Date: 2026-10-18 19:37:05.597823
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1668e83d1178'
+down_revision: Union[str, Sequence[str], None] = '320478567581'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing orders have no recorded creation time (the outbox rows are
+    # deleted once relayed), so they keep NULL rather than all getting the
+    # migration time: the created_from/created_to filters then skip them
+    # instead of misplacing them. Adding the column without a default and
+    # setting it afterwards applies now() to new rows only.
+    op.add_column('orders', sa.Column('created_at', sa.DateTime(timezone=True), nullable=True))
+    op.alter_column('orders', 'created_at', server_default=sa.text('now()'))
+
+    # orders takes writes all day, so build without holding a table lock;
+    # CONCURRENTLY cannot run in a transaction.
+    with op.get_context().autocommit_block():
+        # Keyset pagination on id within a restaurant, optionally filtered
+        op.create_index('ix_orders_restaurant_id_id', 'orders', ['restaurant_id', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_orders_restaurant_id_status_id', 'orders', ['restaurant_id', 'status', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_orders_restaurant_id_payment_status_id', 'orders', ['restaurant_id', 'payment_status', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_orders_restaurant_id_created_at', 'orders', ['restaurant_id', 'created_at'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_orders_restaurant_id_created_at', table_name='orders', postgresql_concurrently=True)
+        op.drop_index('ix_orders_restaurant_id_payment_status_id', table_name='orders', postgresql_concurrently=True)
+        op.drop_index('ix_orders_restaurant_id_status_id', table_name='orders', postgresql_concurrently=True)
+        op.drop_index('ix_orders_restaurant_id_id', table_name='orders', postgresql_concurrently=True)
+    op.drop_column('orders', 'created_at')
@@ -0,0 +1,59 @@
+"""hot path order indexes
+
+Revision ID: 9c41d2e7a0b3
+Revises: 1668e83d1178
+Create Date: 2026-10-18 19:58:12.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c41d2e7a0b3'
+down_revision: Union[str, Sequence[str], None] = '1668e83d1178'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE_ORDERS = sa.text("status NOT IN ('COMPLETED', 'CANCELLED')")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # orders and order_items take writes all day, so build and drop
+    # without holding a table lock; CONCURRENTLY cannot run in a transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_orders_restaurant_id_status_active',
+            'orders',
+            ['restaurant_id', 'status'],
+            unique=False,
+            postgresql_where=ACTIVE_ORDERS,
+            postgresql_concurrently=True,
+        )
+        # Item loads and ON DELETE CASCADE from orders
+        op.create_index(
+            op.f('ix_order_items_order_id'),
+            'order_items',
+            ['order_id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        # A handful of distinct values each: never used by the planner on
+        # their own, only maintained on every write. The composite
+        # restaurant_id indexes cover the filtered listings.
+        op.drop_index(op.f('ix_orders_status'), table_name='orders', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_orders_payment_status'), table_name='orders', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_restaurants_plan'), table_name='restaurants', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_restaurants_plan'), 'restaurants', ['plan'], unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_orders_payment_status'), 'orders', ['payment_status'], unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_orders_status'), 'orders', ['status'], unique=False, postgresql_concurrently=True)
+        op.drop_index(op.f('ix_order_items_order_id'), table_name='order_items', postgresql_concurrently=True)
+        op.drop_index('ix_orders_restaurant_id_status_active', table_name='orders', postgresql_concurrently=True)